@@ -0,0 +1,90 @@
+"""Throughput of sequential vs per-user concurrent update processing.
+
+Simulated users each send ``--messages`` texts at once through
+benchmarks.fakeTelegram. The handler waits ``--work`` seconds, standing in
+for a photo download or a slow send_photo, then replies with the text. The
+run reports throughput and checks that every user's replies came back in
+the order their messages were sent.
+
+Run from the repository root:
+
+    python -m benchmarks.concurrent_updates --users 50 --messages 5
+"""
+import argparse
+import asyncio
+import time
+from collections import defaultdict
+
+from telegram import Update
+from telegram.ext import ApplicationBuilder, MessageHandler, filters
+
+from benchmarks.fakeTelegram import FakeTelegram
+from utils.updateProcessor import PerUserUpdateProcessor
+
+TOKEN = "123456:bench"
+
+
+async def _run(label, concurrent_updates, users, messages, work):
+    fake = FakeTelegram().start()
+    application = (
+        ApplicationBuilder()
+        .token(TOKEN)
+        .base_url(fake.base_url)
+        .concurrent_updates(concurrent_updates)
+        .build()
+    )
+
+    async def slow_echo(update: Update, context):
+        await asyncio.sleep(work)
+        await context.bot.send_message(update.effective_chat.id, update.message.text)
+
+    application.add_handler(MessageHandler(filters.TEXT, slow_echo))
+    total = users * messages
+
+    async with application:
+        await application.start()
+        await application.updater.start_polling(poll_interval=0, timeout=10)
+        start = time.perf_counter()
+        update_id = 1
+        for n in range(messages):
+            for user_id in range(1, users + 1):
+                fake.push_update(fake.text_update(update_id, user_id, str(n)))
+                update_id += 1
+        await asyncio.to_thread(fake.wait_for_sent, total, 300)
+        elapsed = time.perf_counter() - start
+        await application.updater.stop()
+        await application.stop()
+    fake.stop()
+
+    replies = defaultdict(list)
+    for _, _, params in fake.sent:
+        replies[params["chat_id"]].append(int(params["text"]))
+    in_order = all(texts == sorted(texts) for texts in replies.values())
+    print(
+        f"{label:>10}: {len(fake.sent)}/{total} updates in {elapsed:.2f}s "
+        f"({len(fake.sent) / elapsed:,.0f} updates/s), per-user order kept: {in_order}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--messages", type=int, default=5)
+    parser.add_argument("--work", type=float, default=0.02)
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+
+    asyncio.run(_run("sequential", False, args.users, args.messages, args.work))
+    asyncio.run(
+        _run(
+            "per-user",
+            PerUserUpdateProcessor(args.concurrency),
+            args.users,
+            args.messages,
+            args.work,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""Update throughput of the database layer under concurrent simulated users.
+
+Each simulated update performs the same calls a text update triggers in the
+handlers (is_blocked, is_admin, search_martyr and, every few updates, a
+save_martyr_data). The "sync" mode calls DatabaseManager directly on the event
+loop, the "async" mode awaits AsyncDatabaseManager. A heartbeat coroutine
+measures how long the loop is stalled, which is what every other chat feels.
+
+With the database in the page cache every call returns in microseconds and
+the thread hand-off of the async mode costs more than it saves. Each
+``--latency`` value reruns both modes with that many milliseconds added to
+every read and every commit, standing in for a slow disk (an fsync on a
+checkpoint, a cold page read): there the sync mode stalls the loop for each
+call while the async mode overlaps reads on the reader pool.
+
+Run from the repository root:
+
+    python -m benchmarks.db_throughput --users 200 --updates 20 --latency 0 2
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+
+from utils.asyncDatabase import AsyncDatabaseManager
+from utils.database import DatabaseManager
+
+
+class SlowDiskDatabaseManager(DatabaseManager):
+    """DatabaseManager that sleeps ``latency`` seconds per read and commit."""
+
+    def __init__(self, *args, latency=0.0, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.latency = latency
+
+    @contextmanager
+    def _read(self):
+        with super()._read() as cursor:
+            time.sleep(self.latency)
+            yield cursor
+
+    @contextmanager
+    def _write(self):
+        # Inside the write lock, where a real fsync would hold it.
+        with super()._write() as cursor:
+            yield cursor
+            time.sleep(self.latency)
+
+
+def _martyr(user_id, n):
+    return {
+        "name": f"شهيد {user_id}-{n}",
+        "mother_name": "الأم",
+        "birth_date": "1990-01-01",
+        "death_date": "2020-01-01",
+        "death_cause": "سبب",
+        "residence": "القرية",
+        "photo": None,
+        "notes": None,
+    }
+
+
+async def _heartbeat(stop, lags, interval=0.005):
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        expected = loop.time() + interval
+        await asyncio.sleep(interval)
+        lags.append(max(0.0, loop.time() - expected))
+
+
+async def _simulate_user(db, user_id, updates, is_async):
+    for n in range(updates):
+        if is_async:
+            await db.is_blocked(user_id)
+            await db.is_admin(user_id)
+            await db.search_martyr(f"شهيد {user_id}")
+            if n % 5 == 0:
+                await db.save_martyr_data(_martyr(user_id, n))
+        else:
+            db.is_blocked(user_id)
+            db.is_admin(user_id)
+            db.search_martyr(f"شهيد {user_id}")
+            if n % 5 == 0:
+                db.save_martyr_data(_martyr(user_id, n))
+        await asyncio.sleep(0)
+
+
+async def _run(mode, users, updates, latency, db_path):
+    sync_db = SlowDiskDatabaseManager(db_path, latency=latency / 1000)
+    if mode == "async":
+        db = AsyncDatabaseManager(sync_db)
+        await db.connect()
+    else:
+        db = sync_db
+        db.connect()
+
+    stop = asyncio.Event()
+    lags = []
+    heartbeat = asyncio.create_task(_heartbeat(stop, lags))
+    start = time.perf_counter()
+    await asyncio.gather(
+        *(_simulate_user(db, uid, updates, mode == "async") for uid in range(users))
+    )
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await heartbeat
+
+    if mode == "async":
+        await db.close()
+    else:
+        db.close()
+
+    total = users * updates
+    max_lag = max(lags) * 1000 if lags else 0.0
+    print(
+        f"{mode:>5}, {latency:g}ms latency: {total} updates in {elapsed:.2f}s "
+        f"({total / elapsed:,.0f} updates/s), "
+        f"heartbeats={len(lags)}, max loop stall={max_lag:.1f}ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--updates", type=int, default=20)
+    parser.add_argument(
+        "--latency",
+        type=float,
+        nargs="+",
+        default=[0.0, 2.0],
+        help="milliseconds added to every read and commit",
+    )
+    args = parser.parse_args()
+
+    for latency in args.latency:
+        for mode in ("sync", "async"):
+            with tempfile.TemporaryDirectory() as tmp:
+                asyncio.run(
+                    _run(
+                        mode,
+                        args.users,
+                        args.updates,
+                        latency,
+                        os.path.join(tmp, "bench.db"),
+                    )
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""Peak memory of the streaming export as the archive grows.
+
+For each size a database of approved martyrs is built (every tenth one with
+a small photo file), then exported to CSV, JSONL and a ZIP with photos in a
+fresh process that reports its peak RSS. With a streaming export the peak
+stays flat while the row count grows tenfold.
+
+Run from the repository root:
+
+    python -m benchmarks.export_memory --sizes 10000 100000
+"""
+import argparse
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from utils.database import DatabaseManager
+
+
+def _build(db_path, photo_dir, size):
+    db = DatabaseManager(db_path, readers=1)
+    db.connect()
+    os.makedirs(photo_dir, exist_ok=True)
+    records = []
+    for n in range(size):
+        records.append(
+            {
+                "name": f"شهيد رقم {n}",
+                "mother_name": "الأم",
+                "birth_date": "1990-01-01",
+                "death_date": "2020-01-01",
+                "death_cause": "سبب",
+                "residence": "القرية",
+                "notes": "ملاحظات " * 10,
+            }
+        )
+        if len(records) == 5000:
+            db.import_martyrs(records)
+            records = []
+    if records:
+        db.import_martyrs(records)
+    with db._write() as cursor:
+        cursor.execute("SELECT id FROM martyrs WHERE id % 10 = 0")
+        photos = []
+        for (martyr_id,) in cursor.fetchall():
+            path = os.path.join(photo_dir, f"{martyr_id}.jpg")
+            with open(path, "wb") as file:
+                file.write(os.urandom(20_000))
+            photos.append((path, martyr_id))
+        cursor.executemany("UPDATE martyrs SET photo = ? WHERE id = ?", photos)
+    db.close()
+
+
+def _child(db_path, out_path, file_format, include_photos):
+    from utils.martyrExporter import MartyrExport
+
+    db = DatabaseManager(db_path, readers=1)
+    db.connect()
+    start = time.perf_counter()
+    with MartyrExport(out_path, file_format, include_photos) as export:
+        count = db.export_martyrs(export.write_batch)
+    elapsed = time.perf_counter() - start
+    db.close()
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"{count} {elapsed:.2f} {peak_mb:.1f} {os.path.getsize(out_path) / 2**20:.1f}")
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "--child":
+        _child(sys.argv[2], sys.argv[3], sys.argv[4], sys.argv[5] == "1")
+        return
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000])
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        with tempfile.TemporaryDirectory() as directory:
+            db_path = os.path.join(directory, "martyrs.db")
+            _build(db_path, os.path.join(directory, "photos"), size)
+            for file_format, include_photos, name in (
+                ("csv", False, "martyrs.csv"),
+                ("jsonl", False, "martyrs.jsonl"),
+                ("csv", True, "martyrs.zip"),
+            ):
+                output = subprocess.run(
+                    [
+                        sys.executable,
+                        "-m",
+                        "benchmarks.export_memory",
+                        "--child",
+                        db_path,
+                        os.path.join(directory, name),
+                        file_format,
+                        "1" if include_photos else "0",
+                    ],
+                    capture_output=True,
+                    text=True,
+                    check=True,
+                ).stdout.split()
+                count, elapsed, peak_mb, file_mb = output[-4:]
+                print(
+                    f"{size:>8} rows {name:>14}: {count} exported in {elapsed}s, "
+                    f"{file_mb} MB file, peak RSS {peak_mb} MB"
+                )
+
+
+if __name__ == "__main__":
+    main()
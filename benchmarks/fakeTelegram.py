@@ -0,0 +1,185 @@
+"""A minimal local stand-in for the Telegram Bot API.
+
+It serves the handful of methods the benchmarks need over plain HTTP, so an
+Application can be pointed at it with ``ApplicationBuilder().base_url(...)``.
+Updates are injected with ``push_update`` (delivered to getUpdates) and every
+outgoing sendMessage/sendPhoto call is recorded with its arrival time.
+
+With ``enforce_limits`` set it answers like Telegram under flood control:
+more than ``overall_limit`` sends in a second, or ``chat_limit`` to one chat,
+is refused with a 429 and ``retry_after`` instead of being recorded.
+"""
+import json
+import threading
+import time
+from collections import defaultdict, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl
+
+BOT_USER = {"id": 1, "is_bot": True, "first_name": "bench", "username": "bench_bot"}
+
+
+class FloodError(Exception):
+    def __init__(self, retry_after):
+        super().__init__(retry_after)
+        self.retry_after = retry_after
+
+
+class FakeTelegram:
+    def __init__(
+        self,
+        host="127.0.0.1",
+        port=0,
+        response_delay=0.0,
+        enforce_limits=False,
+        overall_limit=30,
+        chat_limit=1,
+    ):
+        self.response_delay = response_delay
+        self.enforce_limits = enforce_limits
+        self.overall_limit = overall_limit
+        self.chat_limit = chat_limit
+        self._recent = deque()
+        self._recent_by_chat = defaultdict(deque)
+        self.flood_errors = 0
+        self._updates = []
+        self._condition = threading.Condition()
+        self._next_message_id = 1
+        self.sent = []  # (arrival time, method, params)
+        self.sent_event = threading.Condition()
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address
+        return f"http://{host}:{port}/bot"
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        with self._condition:
+            self._condition.notify_all()
+        self._server.shutdown()
+        self._server.server_close()
+
+    def push_update(self, update):
+        with self._condition:
+            self._updates.append(update)
+            self._condition.notify_all()
+
+    def text_update(self, update_id, user_id, text):
+        return {
+            "update_id": update_id,
+            "message": {
+                "message_id": update_id,
+                "date": int(time.time()),
+                "chat": {"id": user_id, "type": "private"},
+                "from": {"id": user_id, "is_bot": False, "first_name": "user"},
+                "text": text,
+            },
+        }
+
+    def _get_updates(self, params):
+        offset = int(params.get("offset", 0) or 0)
+        timeout = float(params.get("timeout", 0) or 0)
+        deadline = time.monotonic() + timeout
+        with self._condition:
+            while True:
+                self._updates = [u for u in self._updates if u["update_id"] >= offset]
+                if self._updates or time.monotonic() >= deadline:
+                    updates, self._updates = self._updates, []
+                    return updates
+                self._condition.wait(deadline - time.monotonic())
+
+    def _message(self, params):
+        with self._condition:
+            message_id = self._next_message_id
+            self._next_message_id += 1
+        return {
+            "message_id": message_id,
+            "date": int(time.time()),
+            "chat": {"id": int(params.get("chat_id", 0)), "type": "private"},
+            "from": BOT_USER,
+            "text": params.get("text", ""),
+        }
+
+    def _flooded(self, chat_id):
+        """Record a send attempt and return whether it breaks the limits."""
+        now = time.monotonic()
+        with self._condition:
+            chat_recent = self._recent_by_chat[chat_id]
+            for recent in (self._recent, chat_recent):
+                while recent and now - recent[0] >= 1:
+                    recent.popleft()
+            if len(self._recent) >= self.overall_limit or len(chat_recent) >= self.chat_limit:
+                self.flood_errors += 1
+                return True
+            self._recent.append(now)
+            chat_recent.append(now)
+            return False
+
+    def _call(self, method, params):
+        if method == "getMe":
+            return BOT_USER
+        if method in ("deleteWebhook", "setWebhook", "answerCallbackQuery"):
+            return True
+        if method == "getUpdates":
+            return self._get_updates(params)
+        if method in ("sendMessage", "sendPhoto"):
+            if self.response_delay:
+                time.sleep(self.response_delay)
+            if self.enforce_limits and self._flooded(params.get("chat_id")):
+                raise FloodError(1)
+            with self.sent_event:
+                self.sent.append((time.perf_counter(), method, params))
+                self.sent_event.notify_all()
+            return self._message(params)
+        return True
+
+    def wait_for_sent(self, count, timeout=30):
+        deadline = time.monotonic() + timeout
+        with self.sent_event:
+            while len(self.sent) < count and time.monotonic() < deadline:
+                self.sent_event.wait(deadline - time.monotonic())
+        return len(self.sent) >= count
+
+    def _handler_class(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                method = self.path.rsplit("/", 1)[-1]
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                content_type = self.headers.get("Content-Type", "")
+                if "json" in content_type:
+                    params = json.loads(body or b"{}")
+                elif "multipart" in content_type:
+                    params = {}
+                else:
+                    params = dict(parse_qsl(body.decode()))
+                try:
+                    payload = {"ok": True, "result": fake._call(method, params)}
+                    status = 200
+                except FloodError as e:
+                    payload = {
+                        "ok": False,
+                        "error_code": 429,
+                        "description": f"Too Many Requests: retry after {e.retry_after}",
+                        "parameters": {"retry_after": e.retry_after},
+                    }
+                    status = 429
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+        return Handler
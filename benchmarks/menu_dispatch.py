@@ -0,0 +1,71 @@
+"""Per-update cost of matching a reply-keyboard button.
+
+"regex chain" replays the previous layout: one MessageHandler with a
+filters.Regex per button, checked in order until one matches. "table" is
+the current layout: a single text MessageHandler followed by a lookup in
+BotHandlers.menu_commands. Both are timed for every button and for a text
+that matches nothing, which is the worst case for the chain.
+
+Run from the repository root:
+
+    python -m benchmarks.menu_dispatch --rounds 20000
+"""
+import argparse
+import datetime
+import time
+
+from telegram import Chat, Message, Update, User
+from telegram.ext import MessageHandler, filters
+
+from handlers.bot import BotHandlers
+
+
+async def _noop(update, context):
+    pass
+
+
+def _update(text):
+    message = Message(
+        message_id=1,
+        date=datetime.datetime.now(datetime.timezone.utc),
+        chat=Chat(1, Chat.PRIVATE),
+        from_user=User(1, "user", False),
+        text=text,
+    )
+    return Update(1, message=message)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=20000)
+    args = parser.parse_args()
+
+    menu_commands = BotHandlers(None).menu_commands
+    chain = [
+        MessageHandler(filters.Regex(f"^({text})$"), _noop) for text in menu_commands
+    ]
+    router = MessageHandler(filters.TEXT & ~filters.COMMAND, _noop)
+    updates = [_update(text) for text in menu_commands] + [_update("نص غير معروف")]
+
+    start = time.perf_counter()
+    for _ in range(args.rounds):
+        for update in updates:
+            for handler in chain:
+                if handler.check_update(update):
+                    break
+    chain_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(args.rounds):
+        for update in updates:
+            if router.check_update(update):
+                menu_commands.get(update.message.text)
+    table_time = time.perf_counter() - start
+
+    total = args.rounds * len(updates)
+    print(f"regex chain: {chain_time / total * 1e6:.2f} µs/update")
+    print(f"      table: {table_time / total * 1e6:.2f} µs/update")
+
+
+if __name__ == "__main__":
+    main()
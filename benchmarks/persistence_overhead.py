@@ -0,0 +1,64 @@
+"""Per-update overhead of SQLitePersistence.
+
+Each simulated update changes one user's draft in user_data and the state of
+their conversation, like a step of the add-martyr conversation. "batched"
+lets the persistence write every ``--batch`` updates in one transaction, as
+it does once per Application update run; "per-update" flushes after every
+update, which is what writing on each update would cost.
+
+Run from the repository root:
+
+    python -m benchmarks.persistence_overhead --updates 5000 --batch 500
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+from utils.asyncDatabase import AsyncDatabaseManager
+from utils.database import DatabaseManager
+from utils.persistence import SQLitePersistence
+from utils.states import States
+
+
+async def _run(label, updates, batch, db_path):
+    database_manager = AsyncDatabaseManager(DatabaseManager(db_path))
+    await database_manager.connect()
+    persistence = SQLitePersistence(database_manager)
+
+    start = time.perf_counter()
+    for n in range(updates):
+        user_id = n % 1000
+        await persistence.update_user_data(
+            user_id,
+            {"martyr_data": {"name": f"شهيد {n}", "mother_name": "الأم", "notes": "x" * 50}},
+        )
+        await persistence.update_conversation(
+            "martyr_conversation", (user_id, user_id), States.STATE_BIRTH_DATE
+        )
+        if (n + 1) % batch == 0:
+            await persistence.flush()
+    await persistence.flush()
+    elapsed = time.perf_counter() - start
+
+    await database_manager.close()
+    print(
+        f"{label:>10}: {updates} updates in {elapsed:.2f}s "
+        f"({elapsed / updates * 1e6:,.0f} µs/update)"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--updates", type=int, default=5000)
+    parser.add_argument("--batch", type=int, default=500)
+    args = parser.parse_args()
+
+    for label, batch in (("per-update", 1), ("batched", args.batch)):
+        with tempfile.TemporaryDirectory() as tmp:
+            asyncio.run(_run(label, args.updates, batch, os.path.join(tmp, "bench.db")))
+
+
+if __name__ == "__main__":
+    main()
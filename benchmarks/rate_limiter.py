@@ -0,0 +1,44 @@
+"""Cost per message of RateLimiter as the number of distinct users grows.
+
+Messages are spread round-robin over ``users`` distinct user ids, the worst
+case for locality. The cost per check should stay flat from 1k to 100k
+users and the number of tracked entries should never exceed the cap.
+
+Run from the repository root:
+
+    python -m benchmarks.rate_limiter --messages 1000000
+"""
+import argparse
+import time
+
+from utils.filters import RateLimit, RateLimiter
+
+
+def _run(users, messages, max_entries):
+    limiter = RateLimiter(
+        {"message": RateLimit(3, 5)}, max_entries=max_entries, idle_ttl=3600
+    )
+    now = 0.0
+    start = time.perf_counter()
+    for n in range(messages):
+        now += 0.0001
+        limiter.is_limited(n % users, "message", now)
+    elapsed = time.perf_counter() - start
+    print(
+        f"{users:>7} users: {elapsed / messages * 1e9:,.0f} ns/message, "
+        f"{len(limiter)} entries tracked (cap {max_entries})"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--messages", type=int, default=1_000_000)
+    parser.add_argument("--max-entries", type=int, default=50_000)
+    args = parser.parse_args()
+
+    for users in (1_000, 10_000, 100_000):
+        _run(users, args.messages, args.max_entries)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""Search latency and hit rate with and without the result cache.
+
+A database of approved martyrs is searched with a Zipf-distributed workload:
+the query for the k-th most popular name is drawn with probability
+proportional to 1 / k**s, as a few names draw most of the searches. Each
+lookup runs search_martyrs and renders the top result's card, as
+process_search_martyr does. Every ``--approve-every`` searches a pending
+submission is approved, which clears the cache as the new row may match
+any query.
+
+Run from the repository root:
+
+    python -m benchmarks.search_cache --rows 5000 --searches 5000 --s 1.1
+"""
+import argparse
+import bisect
+import itertools
+import os
+import random
+import tempfile
+import time
+
+from utils.database import DatabaseManager
+from utils.martyrCard import card_cache, render_card
+
+FIRST_NAMES = ("محمد", "أحمد", "علي", "حسن", "خالد", "عمر", "يوسف", "إبراهيم")
+FAMILY_NAMES = ("الأحمد", "العلي", "الحسن", "الخطيب", "النجار", "الحلبي", "الشامي")
+
+
+def _build(db_path, rows):
+    db = DatabaseManager(db_path, readers=2, search_cache_size=0)
+    db.connect()
+    names = [
+        f"{first} {father} {family} {n}"
+        for n, (first, father, family) in zip(
+            range(rows),
+            itertools.cycle(itertools.product(FIRST_NAMES, FIRST_NAMES, FAMILY_NAMES)),
+        )
+    ]
+    for start in range(0, rows, 5000):
+        db.import_martyrs(
+            [
+                {"name": name, "residence": "القرية", "notes": "ملاحظات"}
+                for name in names[start : start + 5000]
+            ]
+        )
+    db.import_martyrs(
+        [{"name": f"مقدم {n}"} for n in range(rows // 100 + 1)], status="pending"
+    )
+    db.close()
+    return names
+
+
+def _zipf_sampler(population, s, rng):
+    cumulative = list(itertools.accumulate(1 / k**s for k in range(1, len(population) + 1)))
+    total = cumulative[-1]
+
+    def sample():
+        return population[bisect.bisect(cumulative, rng.random() * total)]
+
+    return sample
+
+
+def _run(db_path, queries, cache_size, approve_every):
+    db = DatabaseManager(db_path, readers=2, search_cache_size=cache_size)
+    db.connect()
+    card_cache.clear()
+    card_cache.hits = card_cache.misses = 0
+    with db._read() as cursor:
+        cursor.execute("SELECT id FROM martyrs WHERE status = 'pending' ORDER BY id")
+        pending = [row[0] for row in cursor.fetchall()]
+
+    latencies = []
+    start = time.perf_counter()
+    for n, query in enumerate(queries, start=1):
+        began = time.perf_counter()
+        results = db.search_martyrs(query, 5)
+        if results:
+            render_card(results[0])
+        latencies.append(time.perf_counter() - began)
+        if approve_every and n % approve_every == 0 and pending:
+            db.approve_martyr(pending.pop())
+    elapsed = time.perf_counter() - start
+    stats = db.search_cache.stats()
+    db.close()
+    latencies.sort()
+    return {
+        "rate": len(queries) / elapsed,
+        "p50": latencies[len(latencies) // 2] * 1000,
+        "p99": latencies[int(len(latencies) * 0.99)] * 1000,
+        "search_hit_rate": stats["hit_rate"],
+        "card_hit_rate": card_cache.stats()["hit_rate"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--searches", type=int, default=5000)
+    parser.add_argument("--s", type=float, default=1.1, help="Zipf exponent")
+    parser.add_argument("--cache-size", type=int, default=1024)
+    parser.add_argument("--approve-every", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        db_path = os.path.join(directory, "martyrs.db")
+        names = _build(db_path, args.rows)
+        rng = random.Random(args.seed)
+        rng.shuffle(names)
+        sample = _zipf_sampler(names, args.s, rng)
+        queries = [sample() for _ in range(args.searches)]
+        print(
+            f"{args.rows} martyrs, {args.searches} searches over "
+            f"{len(set(queries))} distinct queries (Zipf s={args.s})"
+        )
+        for label, cache_size in (("no cache", 0), ("cache", args.cache_size)):
+            result = _run(db_path, queries, cache_size, args.approve_every)
+            print(
+                f"{label:>9}: {result['rate']:8.0f} searches/s, "
+                f"p50 {result['p50']:.3f} ms, p99 {result['p99']:.3f} ms, "
+                f"search hit rate {result['search_hit_rate']:.0%}, "
+                f"card hit rate {result['card_hit_rate']:.0%}"
+            )
+
+
+if __name__ == "__main__":
+    main()
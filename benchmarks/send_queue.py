@@ -0,0 +1,81 @@
+"""Delivery of a send burst with and without the outbound rate limiter.
+
+benchmarks.fakeTelegram runs with flood control on (30 sends/s overall, one
+per second per chat), like the real API. The burst is ``--admin`` review
+notifications to one admin chat plus one reply to each of ``--users``
+chats, all started at once. Without a limiter the excess sends fail with
+RetryAfter; with utils.sendQueue.OutboundRateLimiter they are paced so
+every message arrives.
+
+Run from the repository root:
+
+    python -m benchmarks.send_queue --admin 10 --users 100
+"""
+import argparse
+import asyncio
+import time
+
+from telegram.error import RetryAfter
+from telegram.ext import ExtBot
+
+from benchmarks.fakeTelegram import FakeTelegram
+from utils.sendQueue import OutboundRateLimiter
+
+TOKEN = "123456:bench"
+ADMIN_CHAT_ID = 1
+
+
+async def _sample_depth(rate_limiter, samples):
+    while True:
+        samples.append(rate_limiter.queue_depth)
+        await asyncio.sleep(0.05)
+
+
+async def _run(label, rate_limiter, admin, users):
+    fake = FakeTelegram(enforce_limits=True).start()
+    bot = ExtBot(TOKEN, base_url=fake.base_url, rate_limiter=rate_limiter)
+    sends = [
+        bot.send_message(ADMIN_CHAT_ID, f"review {n}", parse_mode="HTML")
+        for n in range(admin)
+    ]
+    sends += [bot.send_message(ADMIN_CHAT_ID + n, "ok") for n in range(1, users + 1)]
+    depths = []
+
+    async with bot:
+        sampler = None
+        if rate_limiter is not None:
+            sampler = asyncio.create_task(_sample_depth(rate_limiter, depths))
+        start = time.perf_counter()
+        results = await asyncio.gather(*sends, return_exceptions=True)
+        elapsed = time.perf_counter() - start
+        if sampler is not None:
+            sampler.cancel()
+    fake.stop()
+
+    failed = sum(isinstance(result, Exception) for result in results)
+    flooded = sum(isinstance(result, RetryAfter) for result in results)
+    line = (
+        f"{label:>12}: delivered {len(fake.sent)}/{len(sends)} in {elapsed:.2f}s, "
+        f"failed: {failed} ({flooded} RetryAfter), 429s served: {fake.flood_errors}"
+    )
+    if rate_limiter is not None:
+        stats = rate_limiter.stats()
+        line += (
+            f", max queue depth: {max(depths, default=0)}, "
+            f"retried: {stats['retried']}"
+        )
+    print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--admin", type=int, default=10)
+    parser.add_argument("--users", type=int, default=100)
+    args = parser.parse_args()
+
+    asyncio.run(_run("no limiter", None, args.admin, args.users))
+    asyncio.run(_run("send queue", OutboundRateLimiter(), args.admin, args.users))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""End-to-end update latency for polling and webhook mode.
+
+An echo Application is pointed at benchmarks.fakeTelegram. For each update
+the clock starts when the update is handed to "Telegram" (queued for
+getUpdates, or POSTed to the bot's webhook server) and stops when the
+reply's sendMessage reaches the fake API.
+
+Run from the repository root:
+
+    python -m benchmarks.update_latency --updates 200
+"""
+import argparse
+import asyncio
+import socket
+import statistics
+import time
+
+import httpx
+from telegram import Update
+from telegram.ext import ApplicationBuilder, MessageHandler, filters
+
+from benchmarks.fakeTelegram import FakeTelegram
+
+TOKEN = "123456:bench"
+
+
+async def _echo(update: Update, context):
+    await context.bot.send_message(update.effective_chat.id, update.message.text)
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _report(mode, fake, started):
+    latencies = sorted(
+        (arrival - started[int(params["text"])]) * 1000
+        for arrival, _, params in fake.sent
+    )
+    print(
+        f"{mode:>8}: n={len(latencies)} "
+        f"median={statistics.median(latencies):.2f}ms "
+        f"p95={latencies[int(len(latencies) * 0.95) - 1]:.2f}ms "
+        f"max={latencies[-1]:.2f}ms"
+    )
+
+
+async def _run(mode, updates):
+    fake = FakeTelegram().start()
+    application = ApplicationBuilder().token(TOKEN).base_url(fake.base_url).build()
+    application.add_handler(MessageHandler(filters.TEXT, _echo))
+    started = {}
+
+    async with application:
+        await application.start()
+        if mode == "polling":
+            await application.updater.start_polling(
+                poll_interval=0, timeout=10, allowed_updates=[Update.MESSAGE]
+            )
+            for n in range(1, updates + 1):
+                started[n] = time.perf_counter()
+                fake.push_update(fake.text_update(n, n, str(n)))
+                await asyncio.to_thread(fake.wait_for_sent, n)
+        else:
+            port = _free_port()
+            await application.updater.start_webhook(
+                listen="127.0.0.1",
+                port=port,
+                url_path="hook",
+                webhook_url=f"http://127.0.0.1:{port}/hook",
+                allowed_updates=[Update.MESSAGE],
+            )
+            async with httpx.AsyncClient() as client:
+                for n in range(1, updates + 1):
+                    started[n] = time.perf_counter()
+                    await client.post(
+                        f"http://127.0.0.1:{port}/hook",
+                        json=fake.text_update(n, n, str(n)),
+                    )
+                    await asyncio.to_thread(fake.wait_for_sent, n)
+        await application.updater.stop()
+        await application.stop()
+
+    fake.stop()
+    _report(mode, fake, started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--updates", type=int, default=200)
+    args = parser.parse_args()
+
+    for mode in ("polling", "webhook"):
+        asyncio.run(_run(mode, args.updates))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,9 @@
+import asyncio
+import html
 import logging
+import os
+import tempfile
+from collections import Counter
 from telegram import (
     Update,
     ReplyKeyboardMarkup,
@@ -7,8 +12,13 @@ from telegram import (
     InlineKeyboardButton,
     ReplyKeyboardRemove,
 )
+from telegram.error import BadRequest, TelegramError
 from telegram.ext import CallbackContext, ConversationHandler
-from utils.database import database_manager
+from utils.martyrCard import card_cache, render_card
+from utils.martyrExporter import MartyrExport
+from utils.martyrImporter import MartyrImporter, detect_format
+from utils.photoSender import send_martyr_photo
+from utils.sendQueue import OutboundRateLimiter
 from utils.states import States
 
 
@@ -18,6 +28,12 @@ logger = logging.getLogger(__name__)
 class AdminPanelHandlers:
     def __init__(self, database_manager):
         self.database_manager = database_manager
+        self.MARTYRS_PAGE_SIZE = 20
+        self.PENDING_PAGE_SIZE = 20
+        self.IMPORT_MAX_FILE_SIZE = 20 * 1024 * 1024  # Bot API download limit
+        self.IMPORT_ERRORS_SHOWN = 20
+        self.EXPORT_MAX_FILE_SIZE = 50 * 1024 * 1024  # Bot API upload limit
+        self.STATS_ROWS_SHOWN = 10
 
     async def show_admin_panel(self, update: Update, context: CallbackContext):
         markup = ReplyKeyboardMarkup(
@@ -35,6 +51,11 @@ class AdminPanelHandlers:
                     KeyboardButton("عرض الشهداء المعلقة"),
                 ],
                 [
+                    KeyboardButton("استيراد بيانات"),
+                    KeyboardButton("تصدير البيانات"),
+                ],
+                [
+                    KeyboardButton("الإحصائيات"),
                     KeyboardButton("العودة إلى القائمة الرئيسية"),
                 ],
             ],
@@ -50,7 +71,7 @@ class AdminPanelHandlers:
     ):
         try:
             admin_id = int(update.message.text)
-            success = action(admin_id)
+            success = await action(admin_id)
             reply_text = (
                 f"تم تنفيذ الإجراء بنجاح على المستخدم {admin_id}."
                 if success
@@ -130,37 +151,464 @@ class AdminPanelHandlers:
         )
         return ConversationHandler.END
 
-    async def show_pending_martyrs(self, update: Update, context: CallbackContext):
-        """Displays a list of pending martyrs to the admin."""
-        pending_martyrs = self.database_manager.get_pending_martyrs()
+    async def process_admin_action(self, update: Update, context: CallbackContext):
+        """Runs the admin action chosen with the previous button."""
+        actions = {
+            "add_admin": self.process_add_admin,
+            "remove_admin": self.process_remove_admin,
+            "block_user": self.process_block_user,
+            "unblock_user": self.process_unblock_user,
+        }
+        action = actions.get(context.user_data.pop("admin_action", None))
+        if action is None:
+            return ConversationHandler.END
+        return await action(update, context)
 
-        if not pending_martyrs:
+    async def import_button(self, update: Update, context: CallbackContext):
+        await context.bot.send_message(
+            update.effective_chat.id,
+            "يرجى إرسال ملف CSV أو JSON أو JSONL ببيانات الشهداء.\n"
+            "الأعمدة: الاسم، اسم الأم، تاريخ الميلاد، تاريخ الوفاة، "
+            "سبب الوفاة، مكان الإقامة، ملاحظات.",
+        )
+        return States.IMPORT_DOCUMENT
+
+    async def handle_import_document(self, update: Update, context: CallbackContext):
+        """Imports an uploaded CSV/JSON/JSONL document as approved martyrs."""
+        chat_id = update.effective_chat.id
+        if not await self.database_manager.is_admin(update.effective_user.id):
             await context.bot.send_message(
-                update.effective_chat.id, "لا يوجد شهداء معلقة للموافقة عليها."
+                chat_id, "ليس لديك صلاحية لتنفيذ هذا الإجراء."
             )
             return ConversationHandler.END
 
-        keyboard = []
-        for martyr in pending_martyrs:
-            keyboard.append(
+        document = update.message.document
+        file_format = detect_format(document.file_name or "")
+        if file_format is None:
+            await context.bot.send_message(
+                chat_id, "صيغة الملف غير مدعومة. يرجى إرسال ملف CSV أو JSON أو JSONL."
+            )
+            return States.IMPORT_DOCUMENT
+        if (document.file_size or 0) > self.IMPORT_MAX_FILE_SIZE:
+            await context.bot.send_message(
+                chat_id, "حجم الملف أكبر من 20 ميغابايت. يرجى تقسيمه."
+            )
+            return ConversationHandler.END
+
+        await context.bot.send_message(chat_id, "جاري الاستيراد...")
+        fd, path = tempfile.mkstemp(suffix=f".{file_format}")
+        os.close(fd)
+        try:
+            telegram_file = await document.get_file()
+            await telegram_file.download_to_drive(path)
+            importer = MartyrImporter(
+                self.database_manager, submitted_by=update.effective_user.id
+            )
+            report = await importer.run_async(path, file_format)
+        finally:
+            os.remove(path)
+
+        lines = [
+            f"تمت قراءة {report.rows} صفاً في {report.elapsed:.1f} ثانية "
+            f"({report.rows_per_second:,.0f} صف/ثانية).",
+            f"تمت الإضافة: {report.inserted}",
+            f"مكررة: {report.duplicates}",
+            f"أخطاء: {len(report.errors)}",
+        ]
+        if report.failure:
+            lines.append(
+                f"توقفت قراءة الملف بعد الصف {report.rows}: {report.failure}"
+            )
+        lines.extend(
+            f"- الصف {number}: {error}"
+            for number, error in report.errors[: self.IMPORT_ERRORS_SHOWN]
+        )
+        await context.bot.send_message(chat_id, "\n".join(lines))
+        if len(report.errors) > self.IMPORT_ERRORS_SHOWN:
+            await context.bot.send_document(
+                chat_id,
+                "\n".join(
+                    f"row {number}: {error}" for number, error in report.errors
+                ).encode(),
+                filename="import_errors.txt",
+            )
+        return ConversationHandler.END
+
+    async def export_button(self, update: Update, context: CallbackContext):
+        markup = InlineKeyboardMarkup(
+            [
                 [
-                    InlineKeyboardButton(
-                        f"{martyr['name']} (ID: {martyr['id']})",
-                        callback_data=f"review_martyr_{martyr['id']}",
+                    InlineKeyboardButton("CSV", callback_data="export_csv"),
+                    InlineKeyboardButton("JSONL", callback_data="export_jsonl"),
+                ],
+                [InlineKeyboardButton("ZIP مع الصور", callback_data="export_zip")],
+            ]
+        )
+        await context.bot.send_message(
+            update.effective_chat.id,
+            "اختر صيغة تصدير الشهداء المعتمدين:",
+            reply_markup=markup,
+        )
+        return ConversationHandler.END
+
+    async def handle_export(self, update: Update, context: CallbackContext):
+        """Exports the approved martyrs in the chosen format as a document."""
+        query = update.callback_query
+        await query.answer()
+        chat_id = query.message.chat.id
+        if not await self.database_manager.is_admin(query.from_user.id):
+            await context.bot.send_message(
+                chat_id, "ليس لديك صلاحية لتنفيذ هذا الإجراء."
+            )
+            return
+
+        file_format = query.data[len("export_"):]
+        include_photos = file_format == "zip"
+        data_format = "csv" if include_photos else file_format
+        await query.edit_message_text("جاري التصدير...")
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, f"martyrs.{file_format}")
+            try:
+                # Opening the files and deflating the ZIP on close block, so
+                # both run in a worker thread like the batches themselves.
+                export = await asyncio.to_thread(
+                    MartyrExport, path, data_format, include_photos
+                )
+                try:
+                    count = await self.database_manager.export_martyrs(
+                        export.write_batch
                     )
+                finally:
+                    await asyncio.to_thread(export.close)
+            except (ValueError, OSError) as e:
+                logger.error(f"Failed to write export: {e}")
+                count = None
+            if count is None:
+                await query.edit_message_text("حدث خطأ أثناء التصدير.")
+                return
+            if os.path.getsize(path) > self.EXPORT_MAX_FILE_SIZE:
+                await query.edit_message_text(
+                    "حجم ملف التصدير أكبر من 50 ميغابايت. "
+                    "يرجى التصدير بدون صور أو استخدام أداة سطر الأوامر."
+                )
+                return
+            with open(path, "rb") as file:
+                await context.bot.send_document(
+                    chat_id,
+                    file,
+                    filename=f"martyrs.{file_format}",
+                    caption=f"تم تصدير {count} شهيداً.",
+                )
+        await query.delete_message()
+
+    STATS_TITLES = {
+        "residence": "حسب مكان الإقامة",
+        "death_cause": "حسب سبب الوفاة",
+        "death_year": "حسب سنة الوفاة",
+    }
+
+    async def show_stats(self, update: Update, context: CallbackContext):
+        """Shows the approved martyr counters kept in martyr_stats."""
+        stats = await self.database_manager.get_martyr_stats()
+        if stats is None:
+            await context.bot.send_message(
+                update.effective_chat.id, "حدث خطأ أثناء جلب الإحصائيات."
+            )
+            return ConversationHandler.END
+        markup = InlineKeyboardMarkup(
+            [
+                [
+                    InlineKeyboardButton("فحص التطابق", callback_data="stats_check"),
+                    InlineKeyboardButton("إعادة الحساب", callback_data="stats_rebuild"),
                 ]
+            ]
+        )
+        await context.bot.send_message(
+            update.effective_chat.id,
+            self._render_stats(stats, context.bot.rate_limiter),
+            parse_mode="HTML",
+            reply_markup=markup,
+        )
+        return ConversationHandler.END
+
+    def _render_stats(self, stats, send_queue=None):
+        total = sum(count for _, count in stats.get("death_year", []))
+        lines = [f"<b>إحصائيات الشهداء المعتمدين:</b> {total}"]
+        for dimension, title in self.STATS_TITLES.items():
+            rows = stats.get(dimension, [])
+            if dimension == "death_year":
+                rows = sorted(rows, reverse=True)
+            lines.append(f"\n<b>{title}:</b>")
+            for key, count in rows[: self.STATS_ROWS_SHOWN]:
+                lines.append(f"{html.escape(key or 'غير محدد')}: {count}")
+            if len(rows) > self.STATS_ROWS_SHOWN:
+                rest = sum(count for _, count in rows[self.STATS_ROWS_SHOWN:])
+                lines.append(f"أخرى ({len(rows) - self.STATS_ROWS_SHOWN}): {rest}")
+        caches = {
+            cache["name"]: cache
+            for cache in [*self.database_manager.cache_stats(), card_cache.stats()]
+        }
+        lines.append(
+            "\n<b>نسبة الإصابة في الذاكرة المؤقتة:</b> "
+            f"البحث {caches['search_results']['hit_rate']:.0%}، "
+            f"البطاقات {caches['martyr_cards']['hit_rate']:.0%}"
+        )
+        if isinstance(send_queue, OutboundRateLimiter):
+            queue = send_queue.stats()
+            lines.append(
+                f"<b>طابور الإرسال:</b> في الانتظار {queue['queue_depth']}، "
+                f"أُرسل {queue['sent']}، أعيدت المحاولة {queue['retried']}، "
+                f"فشل {queue['failed']}"
+            )
+        return "\n".join(lines)
+
+    async def handle_stats(self, update: Update, context: CallbackContext):
+        """Checks the counters against a recount, or rebuilds them."""
+        query = update.callback_query
+        await query.answer()
+        chat_id = query.message.chat.id
+        if not await self.database_manager.is_admin(query.from_user.id):
+            await context.bot.send_message(
+                chat_id, "ليس لديك صلاحية لتنفيذ هذا الإجراء."
+            )
+            return
+
+        if query.data == "stats_rebuild":
+            if not await self.database_manager.rebuild_martyr_stats():
+                await context.bot.send_message(
+                    chat_id, "حدث خطأ أثناء إعادة حساب الإحصائيات."
+                )
+                return
+            stats = await self.database_manager.get_martyr_stats()
+            if stats is not None:
+                await self._edit_stats(query, stats)
+            await context.bot.send_message(chat_id, "تمت إعادة حساب الإحصائيات.")
+            return
+
+        mismatches = await self.database_manager.check_martyr_stats()
+        if mismatches is None:
+            text = "حدث خطأ أثناء فحص الإحصائيات."
+        elif not mismatches:
+            text = "الإحصائيات مطابقة للبيانات."
+        else:
+            lines = [f"وُجد {len(mismatches)} اختلاف:"]
+            for dimension, key, stored, actual in mismatches[: self.STATS_ROWS_SHOWN]:
+                lines.append(
+                    f"{self.STATS_TITLES.get(dimension, dimension)} - "
+                    f"{html.escape(key or 'غير محدد')}: {stored} بدلاً من {actual}"
+                )
+            lines.append("استخدم «إعادة الحساب» لتصحيحها.")
+            text = "\n".join(lines)
+        await context.bot.send_message(chat_id, text, parse_mode="HTML")
+
+    async def _edit_stats(self, query, stats):
+        try:
+            await query.edit_message_text(
+                self._render_stats(stats, query.get_bot().rate_limiter),
+                parse_mode="HTML",
+                reply_markup=query.message.reply_markup,
+            )
+        except BadRequest as e:
+            if "not modified" not in str(e).lower():
+                raise
+
+    async def show_pending_martyrs(self, update: Update, context: CallbackContext):
+        """Displays the first page of pending martyrs for bulk review."""
+        if update.callback_query:
+            await update.callback_query.answer()
+        if not await self.database_manager.is_admin(update.effective_user.id):
+            await context.bot.send_message(
+                update.effective_chat.id, "ليس لديك صلاحية لتنفيذ هذا الإجراء."
             )
+            return ConversationHandler.END
+
+        page = await self.database_manager.get_martyrs_page(
+            limit=self.PENDING_PAGE_SIZE, status="pending"
+        )
 
-        keyboard.append([InlineKeyboardButton(
-            "العودة", callback_data="admin_panel")])
+        if not page["martyrs"]:
+            await context.bot.send_message(
+                update.effective_chat.id, "لا يوجد شهداء معلقة للموافقة عليها."
+            )
+            return ConversationHandler.END
 
-        markup = InlineKeyboardMarkup(keyboard)
+        total = await self.database_manager.count_martyrs("pending")
+        message_text, markup = self._render_pending_page(page, 0, 0, total)
         await context.bot.send_message(
             update.effective_chat.id,
-            "الشهداء المعلقة للموافقة عليها:",
+            message_text,
+            parse_mode="HTML",
             reply_markup=markup,
         )
-        return States.HANDLE_PENDING_MARTYR_SELECTION
+        # The page's buttons are handled outside the admin conversation.
+        return ConversationHandler.END
+
+    async def handle_bulk_review(self, update: Update, context: CallbackContext):
+        """Handles the checkboxes, navigation and bulk actions of a pending page.
+
+        The callback data is ``bulk_<op>_<after id>_<last id>_<count>_<mask>``:
+        the page holds the pending rows after ``after id``, and bit i of the
+        mask is set when its i-th row is checked. The last id and count catch
+        pages that changed since they were rendered, so a stale mask never
+        selects the wrong rows.
+        """
+        query = update.callback_query
+        if not await self.database_manager.is_admin(query.from_user.id):
+            await query.answer("ليس لديك صلاحية لتنفيذ هذا الإجراء.")
+            return
+
+        _, op, after_id, last_id, count, mask = query.data.split("_")
+        after_id, last_id, count, mask = (
+            int(after_id), int(last_id), int(count), int(mask)
+        )
+
+        if op in ("next", "prev"):
+            if op == "next":
+                page = await self.database_manager.get_martyrs_page(
+                    after_id=last_id,
+                    limit=self.PENDING_PAGE_SIZE,
+                    status="pending",
+                )
+            else:
+                page = await self.database_manager.get_martyrs_page(
+                    before_id=after_id + 1,
+                    limit=self.PENDING_PAGE_SIZE,
+                    status="pending",
+                )
+            await query.answer()
+            if page["martyrs"]:
+                after_id = page["martyrs"][0]["id"] - 1
+            await self._edit_pending_page(query, page, after_id, 0)
+            return
+
+        page = await self.database_manager.get_martyrs_page(
+            after_id=after_id, limit=self.PENDING_PAGE_SIZE, status="pending"
+        )
+        martyrs = page["martyrs"]
+        if not martyrs or martyrs[-1]["id"] != last_id or len(martyrs) != count:
+            await query.answer("تغيرت القائمة، يرجى إعادة التحديد.")
+            await self._edit_pending_page(query, page, after_id, 0)
+            return
+
+        if op.startswith("t"):
+            mask ^= 1 << int(op[1:])
+        elif op == "all":
+            mask = (1 << len(martyrs)) - 1
+        elif op == "none":
+            mask = 0
+        elif op in ("ok", "no"):
+            selected = [
+                martyr["id"] for i, martyr in enumerate(martyrs) if mask >> i & 1
+            ]
+            if not selected:
+                await query.answer("لم يتم تحديد أي شهيد.")
+                return
+            if op == "ok":
+                reviewed = await self.database_manager.approve_martyrs(selected)
+                user_message = "تمت الموافقة على بياناتك وحفظها."
+            else:
+                reviewed = await self.database_manager.reject_martyrs(selected)
+                user_message = "تم رفض بياناتك. يرجى المحاولة مرة أخرى."
+            await query.answer(f"تمت معالجة {len(reviewed)} من {len(selected)}.")
+            context.application.create_task(
+                self._notify_submitters(context, reviewed, user_message)
+            )
+
+            page = await self.database_manager.get_martyrs_page(
+                after_id=after_id, limit=self.PENDING_PAGE_SIZE, status="pending"
+            )
+            if not page["martyrs"] and after_id:
+                after_id = 0
+                page = await self.database_manager.get_martyrs_page(
+                    limit=self.PENDING_PAGE_SIZE, status="pending"
+                )
+            await self._edit_pending_page(query, page, after_id, 0)
+            return
+
+        await query.answer()
+        await self._edit_pending_page(query, page, after_id, mask)
+
+    async def _edit_pending_page(self, query, page, after_id, mask):
+        if not page["martyrs"]:
+            await query.edit_message_text("لا يوجد شهداء معلقة للموافقة عليها.")
+            return
+        total = await self.database_manager.count_martyrs("pending")
+        message_text, markup = self._render_pending_page(page, after_id, mask, total)
+        try:
+            await query.edit_message_text(
+                message_text, parse_mode="HTML", reply_markup=markup
+            )
+        except BadRequest as e:
+            if "not modified" not in str(e):
+                raise
+
+    def _render_pending_page(self, page, after_id, mask, total):
+        martyrs = page["martyrs"]
+
+        def callback(op, mask=mask):
+            return f"bulk_{op}_{after_id}_{martyrs[-1]['id']}_{len(martyrs)}_{mask}"
+
+        keyboard = [
+            [
+                InlineKeyboardButton(
+                    f"{'☑' if mask >> i & 1 else '☐'} {martyr['name']} (ID: {martyr['id']})",
+                    callback_data=callback(f"t{i}"),
+                ),
+                InlineKeyboardButton(
+                    "عرض", callback_data=f"review_martyr_{martyr['id']}"
+                ),
+            ]
+            for i, martyr in enumerate(martyrs)
+        ]
+        selected = mask.bit_count()
+        keyboard.append(
+            [
+                InlineKeyboardButton("تحديد الكل", callback_data=callback("all")),
+                InlineKeyboardButton("إلغاء التحديد", callback_data=callback("none")),
+            ]
+        )
+        keyboard.append(
+            [
+                InlineKeyboardButton(
+                    f"الموافقة على المحدد ({selected})", callback_data=callback("ok")
+                ),
+                InlineKeyboardButton(
+                    f"رفض المحدد ({selected})", callback_data=callback("no")
+                ),
+            ]
+        )
+        navigation = []
+        if page["has_prev"]:
+            navigation.append(
+                InlineKeyboardButton("السابق", callback_data=callback("prev"))
+            )
+        if page["has_next"]:
+            navigation.append(
+                InlineKeyboardButton("التالي", callback_data=callback("next"))
+            )
+        if navigation:
+            keyboard.append(navigation)
+        keyboard.append([InlineKeyboardButton("العودة", callback_data="admin_panel")])
+
+        message_text = (
+            "<b>الشهداء المعلقة للموافقة عليها:</b>\n\n"
+            "حدد الطلبات ثم اختر الإجراء.\n"
+            f"<i>العدد الإجمالي: {total}</i>"
+        )
+        return message_text, InlineKeyboardMarkup(keyboard)
+
+    async def _notify_submitters(self, context: CallbackContext, martyrs, message):
+        """Sends each submitter of ``martyrs`` one message, however many they sent."""
+        counts = Counter(
+            martyr["submitted_by"] for martyr in martyrs if martyr["submitted_by"]
+        )
+        for user_id, count in counts.items():
+            text = message if count == 1 else f"{message} ({count})"
+            try:
+                await context.bot.send_message(user_id, text)
+            except TelegramError as e:
+                logger.warning(f"Failed to notify submitter {user_id}: {e}")
 
     async def handle_pending_martyr_selection(
         self, update: Update, context: CallbackContext
@@ -168,6 +616,11 @@ class AdminPanelHandlers:
         """Handles the selection of a pending martyr."""
         query = update.callback_query
         await query.answer()
+        if not await self.database_manager.is_admin(query.from_user.id):
+            await context.bot.send_message(
+                query.message.chat.id, "ليس لديك صلاحية لتنفيذ هذا الإجراء."
+            )
+            return ConversationHandler.END
 
         if query.data == "admin_panel":
             await self.show_admin_panel(update, context)
@@ -175,7 +628,7 @@ class AdminPanelHandlers:
 
         if query.data.startswith("review_martyr_"):
             martyr_id = int(query.data[len("review_martyr_"):])
-            martyr = database_manager.search_martyr(martyr_id)
+            martyr = await self.database_manager.get_martyr(martyr_id)
 
             if not martyr:
                 await query.edit_message_text("الشهيد غير موجود.")
@@ -194,16 +647,7 @@ class AdminPanelHandlers:
     ):
         """Displays the martyr information with approval/rejection buttons."""
         query = update.callback_query
-        message_text = (
-            "<b>معلومات الشهيد (للمراجعة):</b>\n\n"
-            f"الاسم: {martyr['name']}\n"
-            f"اسم الأم: {martyr['mother_name']}\n"
-            f"تاريخ الميلاد: {martyr['birth_date']}\n"
-            f"تاريخ الوفاة: {martyr['death_date']}\n"
-            f"سبب الوفاة: {martyr['death_cause']}\n"
-            f"مكان الإقامة: {martyr['residence']}\n"
-            f"ملاحظات: {martyr.get('notes', 'لا يوجد')}\n"
-        )
+        message_text = render_card(martyr, "review")
         markup = InlineKeyboardMarkup(
             inline_keyboard=[
                 [
@@ -222,15 +666,16 @@ class AdminPanelHandlers:
             ]
         )
         try:
-            if martyr["photo"]:
-                with open(martyr["photo"], "rb") as photo_file:
-                    await context.bot.send_photo(
-                        chat_id=query.message.chat.id,
-                        photo=photo_file,
-                        caption=message_text,
-                        parse_mode="HTML",
-                        reply_markup=markup,
-                    )
+            if martyr["photo"] or martyr["photo_file_id"]:
+                await send_martyr_photo(
+                    context.bot,
+                    self.database_manager,
+                    query.message.chat.id,
+                    martyr,
+                    caption=render_card(martyr, "review", caption=True),
+                    parse_mode="HTML",
+                    reply_markup=markup,
+                )
             else:
                 await context.bot.send_message(
                     chat_id=query.message.chat.id,
@@ -248,67 +693,80 @@ class AdminPanelHandlers:
                 text="حدث خطأ أثناء عرض بيانات الشهيد.",
             )
 
-    async def handle_admin_approval_from_list(
-        self, update: Update, context: CallbackContext
-    ):
-        """Handles the approval or rejection of a martyr from the pending list."""
-        query = update.callback_query
-        await query.answer()
-        admin_id = query.from_user.id
-        if not self.database_manager.is_admin(admin_id):
+    async def show_all_martyrs(self, update: Update, context: CallbackContext):
+        """Displays the first page of approved martyrs to the admin."""
+        page = await self.database_manager.get_martyrs_page(
+            limit=self.MARTYRS_PAGE_SIZE
+        )
+
+        if not page["martyrs"]:
             await context.bot.send_message(
-                query.message.chat.id, "ليس لديك صلاحية لتنفيذ هذا الإجراء."
+                update.effective_chat.id, "لا يوجد بيانات محفوظة."
             )
             return ConversationHandler.END
 
-        action, martyr_id = query.data.split("_", 1)
-        martyr_id = int(martyr_id)
-
-        if action == "approve":
-            success = self.database_manager.approve_martyr(martyr_id)
-            if success:
-                await query.edit_message_text("تمت الموافقة على بيانات وحفظها.")
-            else:
-                await query.edit_message_text("حدث خطأ أثناء حفظ البيانات.")
-
-        elif action == "reject":
-            # For simplicity, we're just deleting the entry.  You might want to add a 'rejected' flag.
-            # success = self.database_manager.delete_martyr(martyr_id) # Hypothetical delete function
-            # if success:
-            #     await query.edit_message_text("تم رفض بيانات الشهيد وحذفها.")
-            # else:
-            #     await query.edit_message_text("حدث خطأ أثناء حذف البيانات.")
-
-            await query.edit_message_text("تم رفض البيانات.")
-
-        elif action == "pending_list":
-            await self.show_pending_martyrs(update, context)
-            return States.HANDLE_PENDING_MARTYR_SELECTION
-
-        else:
-            await query.edit_message_text("أمر غير صالح.")
-
+        total = await self.database_manager.count_martyrs()
+        message_text, markup = self._render_martyrs_page(page, total)
+        await context.bot.send_message(
+            update.effective_chat.id,
+            message_text,
+            parse_mode="HTML",
+            reply_markup=markup,
+        )
         return ConversationHandler.END
 
-    async def show_all_martyrs(self, update: Update, context: CallbackContext):
-        """Displays a list of all approved martyrs to the admin."""
-        all_martyrs = self.database_manager.get_all_martyrs()
-
-        if not all_martyrs:
+    async def handle_martyrs_page(self, update: Update, context: CallbackContext):
+        """Handles the next/previous buttons of the martyrs list."""
+        query = update.callback_query
+        await query.answer()
+        if not await self.database_manager.is_admin(query.from_user.id):
             await context.bot.send_message(
-                update.effective_chat.id, "لا يوجد بيانات محفوظة."
+                query.message.chat.id, "ليس لديك صلاحية لتنفيذ هذا الإجراء."
             )
-            return ConversationHandler.END
+            return
 
-        message_text = "<b>قائمة الشهداء:</b>\n\n"
-        for martyr in all_martyrs:
-            message_text += (
-                f"- {martyr['name']} (تاريخ الوفاة: {martyr['death_date']})\n"
+        _, direction, martyr_id = query.data.split("_", 2)
+        if direction == "next":
+            page = await self.database_manager.get_martyrs_page(
+                after_id=int(martyr_id), limit=self.MARTYRS_PAGE_SIZE
+            )
+        else:
+            page = await self.database_manager.get_martyrs_page(
+                before_id=int(martyr_id), limit=self.MARTYRS_PAGE_SIZE
             )
 
-        message_text += "\n<i>العدد الإجمالي: {}</i>".format(len(all_martyrs))
+        if not page["martyrs"]:
+            await query.edit_message_text("لا يوجد بيانات محفوظة.")
+            return
 
-        await context.bot.send_message(
-            update.effective_chat.id, message_text, parse_mode="HTML"
+        total = await self.database_manager.count_martyrs()
+        message_text, markup = self._render_martyrs_page(page, total)
+        await query.edit_message_text(
+            message_text, parse_mode="HTML", reply_markup=markup
         )
-        return ConversationHandler.END
+
+    def _render_martyrs_page(self, page, total):
+        martyrs = page["martyrs"]
+        lines = ["<b>قائمة الشهداء:</b>", ""]
+        lines.extend(
+            f"- {html.escape(martyr['name'])} "
+            f"(تاريخ الوفاة: {html.escape(martyr['death_date'] or '')})"
+            for martyr in martyrs
+        )
+        lines.extend(["", f"<i>العدد الإجمالي: {total}</i>"])
+
+        buttons = []
+        if page["has_prev"]:
+            buttons.append(
+                InlineKeyboardButton(
+                    "السابق", callback_data=f"martyrs_prev_{martyrs[0]['id']}"
+                )
+            )
+        if page["has_next"]:
+            buttons.append(
+                InlineKeyboardButton(
+                    "التالي", callback_data=f"martyrs_next_{martyrs[-1]['id']}"
+                )
+            )
+        markup = InlineKeyboardMarkup([buttons]) if buttons else None
+        return "\n".join(lines), markup
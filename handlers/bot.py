@@ -3,6 +3,8 @@ from telegram import (
     KeyboardButton,
     ReplyKeyboardRemove,
 )
+from collections import namedtuple
+from telegram.ext import ApplicationHandlerStop
 from handlers.martyr import (
     MartyrHandlers,
     logging,
@@ -11,21 +13,131 @@ from handlers.martyr import (
     ConversationHandler,
 )
 from handlers.adminPanel import AdminPanelHandlers
-from utils.filters import spam_filter
+from utils.filters import rate_limiter
 
 
 logger = logging.getLogger(__name__)
 
+MenuCommand = namedtuple("MenuCommand", ["callback", "admin_only", "conversation"])
+
 
 class BotHandlers:
     def __init__(self, database_manager):
         self.database_manager = database_manager
         self.martyr_handler = MartyrHandlers(database_manager)
         self.admin_panel_handler = AdminPanelHandlers(database_manager)
+        self.menu_commands = self._build_menu_commands()
+
+    def _build_menu_commands(self):
+        """Maps each reply-keyboard button to its handler.
+
+        ``conversation`` names the ConversationHandler the button enters, if
+        any; main.py uses it to build the entry points, and handle_text
+        dispatches every other button with one lookup.
+        """
+        martyr = self.martyr_handler
+        admin = self.admin_panel_handler
+        return {
+            "إضافة شهيد": MenuCommand(
+                martyr.add_martyr_button, False, "martyr_conversation"
+            ),
+            "البحث عن شهيد": MenuCommand(
+                martyr.search_martyr_button, False, "search_conversation"
+            ),
+            "لوحة التحكم": MenuCommand(
+                admin.show_admin_panel, True, "admin_conversation"
+            ),
+            "عرض الشهداء المعلقة": MenuCommand(
+                admin.show_pending_martyrs, True, "admin_conversation"
+            ),
+            "إضافة مسؤول": MenuCommand(
+                admin.add_admin_button, True, "admin_conversation"
+            ),
+            "إزالة مسؤول": MenuCommand(
+                admin.remove_admin_button, True, "admin_conversation"
+            ),
+            "حظر مستخدم": MenuCommand(
+                admin.block_user_button, True, "admin_conversation"
+            ),
+            "إلغاء حظر مستخدم": MenuCommand(
+                admin.unblock_user_button, True, "admin_conversation"
+            ),
+            "استيراد بيانات": MenuCommand(
+                admin.import_button, True, "admin_conversation"
+            ),
+            "تصدير البيانات": MenuCommand(admin.export_button, True, None),
+            "الإحصائيات": MenuCommand(admin.show_stats, True, None),
+            "عرض قائمة الشهداء": MenuCommand(admin.show_all_martyrs, True, None),
+            "العودة إلى القائمة الرئيسية": MenuCommand(
+                self.show_main_menu, False, None
+            ),
+        }
+
+    def menu_texts(self, conversation):
+        """Returns the button texts that enter ``conversation``."""
+        return frozenset(
+            text
+            for text, command in self.menu_commands.items()
+            if command.conversation == conversation
+        )
+
+    ADMIN_CALLBACK_PREFIXES = (
+        "approve_",
+        "reject_",
+        "review_martyr_",
+        "martyrs_",
+        "bulk_",
+        "export_",
+        "stats_",
+        "pending_list",
+        "admin_panel",
+    )
+
+    def _classify_update(self, update: Update):
+        """Returns the rate-limit action an update counts against."""
+        if update.callback_query:
+            data = update.callback_query.data or ""
+            if data.startswith(self.ADMIN_CALLBACK_PREFIXES):
+                return "admin"
+            if data == "confirm":
+                return "submission"
+        elif update.inline_query:
+            return "inline"
+        elif update.message and update.message.photo:
+            return "submission"
+        return "message"
+
+    async def guard_update(self, update: Update, context: CallbackContext):
+        """Drops updates from blocked or flooding users before any other handler runs.
+
+        Flooded updates are dropped, with at most one notice per "notice"
+        window; blocking is left to handle_text, which sees just the free
+        text no other handler understood. Admins are never blocked and
+        count every update against the "admin" limit.
+        """
+        user = update.effective_user
+        if user is None:
+            return
+
+        if await self.database_manager.is_admin(user.id):
+            action = "admin"
+        elif await self.database_manager.is_blocked(user.id):
+            raise ApplicationHandlerStop
+        else:
+            action = self._classify_update(update)
+        if not rate_limiter.is_limited(user.id, action):
+            return
+
+        notice = "يرجى الانتظار قليلاً قبل المحاولة مجدداً."
+        if update.callback_query:
+            await update.callback_query.answer(notice)
+        elif update.effective_chat and not rate_limiter.is_limited(user.id, "notice"):
+            await context.bot.send_message(update.effective_chat.id, notice)
+        raise ApplicationHandlerStop
 
     async def start(self, update: Update, context: CallbackContext):
         user_id = update.effective_user.id
-        if self.database_manager.is_blocked(user_id):
+        if await self.database_manager.is_blocked(user_id):
             await context.bot.send_message(
                 update.effective_chat.id, "أنت محظور من استخدام هذا البوت."
             )
@@ -41,7 +153,7 @@ class BotHandlers:
                 KeyboardButton("البحث عن شهيد")
             ],
         ]
-        if self.database_manager.is_admin(update.effective_user.id):
+        if await self.database_manager.is_admin(update.effective_user.id):
             keyboard.append([KeyboardButton("لوحة التحكم")])
         markup = ReplyKeyboardMarkup(keyboard=keyboard, resize_keyboard=True)
         await context.bot.send_message(
@@ -50,46 +162,35 @@ class BotHandlers:
         return ConversationHandler.END
 
     async def handle_text(self, update: Update, context: CallbackContext):
-        user_id = update.effective_user.id
-        if spam_filter.is_spam(update.message):
-            self.database_manager.block_user(user_id)
+        """Dispatches a reply-keyboard button through the menu_commands table."""
+        command = self.menu_commands.get(update.message.text)
+        if command is None:
+            user_id = update.effective_user.id
+            if rate_limiter.is_limited(
+                user_id, "spam"
+            ) and not await self.database_manager.is_admin(user_id):
+                await self.database_manager.block_user(user_id)
+                await context.bot.send_message(
+                    update.effective_chat.id, "تم حظرك بسبب إرسال رسائل متكررة."
+                )
+                return ConversationHandler.END
             await context.bot.send_message(
-                update.effective_chat.id, "تم حظرك بسبب إرسال رسائل متكررة."
-            )
-            return ConversationHandler.END
-
-        if self.database_manager.is_blocked(user_id):
-            await context.bot.send_message(
-                update.effective_chat.id, "أنت محظور من استخدام هذا البوت."
+                update.effective_chat.id,
+                "عفواً، لا يمكنني فهم ما طلبته. الرجاء استخدام القائمة.",
+                reply_markup=ReplyKeyboardRemove(),
             )
             return ConversationHandler.END
 
-        text = update.message.text
-        if text == "إضافة شهيد":
-            return await self.martyr_handler.add_martyr_button(update, context)
-        elif text == "البحث عن شهيد":
-            return await self.martyr_handler.search_martyr_button(update, context)
-        elif text == "لوحة التحكم":
-            return await self.admin_panel_handler.show_admin_panel(update, context)
-
-        elif text == "عرض قائمة الشهداء" and self.database_manager.is_admin(
+        if command.admin_only and not await self.database_manager.is_admin(
             update.effective_user.id
         ):
-            return await self.admin_panel_handler.show_all_martyrs(update, context)
-
-        elif text == "عرض الشهداء المعلقة" and self.database_manager.is_admin(
-            update.effective_user.id
-        ):
-            return await self.admin_panel_handler.show_pending_martyrs(update, context)
-
-        else:
             await context.bot.send_message(
-                update.effective_chat.id,
-                "عفواً، لا يمكنني فهم ما طلبته. الرجاء استخدام القائمة.",
-                reply_markup=ReplyKeyboardRemove(),
+                update.effective_chat.id, "ليس لديك صلاحية لتنفيذ هذا الإجراء."
             )
             return ConversationHandler.END
 
+        return await command.callback(update, context)
+
     async def error_handler(self, update: Update, context: CallbackContext):
         "Handle errors in bot"
         pass
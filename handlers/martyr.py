@@ -1,15 +1,23 @@
-import uuid
+import asyncio
 import os
 import logging
 from telegram import (
     Update,
     InlineKeyboardMarkup,
     InlineKeyboardButton,
+    InlineQueryResultArticle,
+    InlineQueryResultCachedPhoto,
+    InputTextMessageContent,
     ReplyKeyboardRemove,
 )
 from telegram.ext import CallbackContext, ConversationHandler
 from utils.dateValidator import DateValidator
 from utils.config import config
+from utils.filters import rate_limiter
+from utils.martyrCard import render_card
+from utils.photoSender import display_photo_size, send_martyr_photo
+from utils.photoStore import photo_store
+from utils.photoProcessor import photo_processor
 from utils.states import States
 
 
@@ -20,10 +28,31 @@ class MartyrHandlers:
     def __init__(self, database_manager):
         self.database_manager = database_manager
         self.MAX_TEXT_LENGTH = 200
+        self.SEARCH_RESULTS_LIMIT = 5
+        self.REJECTION_REASONS = {
+            "duplicate": "البيانات مكررة",
+            "invalid": "البيانات غير صحيحة أو ناقصة",
+            "photo": "الصورة غير مناسبة",
+            "other": "أسباب أخرى",
+        }
+        self.INLINE_PAGE_SIZE = 20
+        self.INLINE_MAX_RESULTS = 100
+        self.INLINE_DEBOUNCE = 0.4  # seconds a query waits for a newer keystroke
+        self.INLINE_CACHE_TIME = 30  # seconds Telegram may reuse an answer
+        # Fields edit_field accepts as text; the photo must be uploaded.
+        self.EDITABLE_FIELDS = (
+            "name",
+            "mother_name",
+            "birth_date",
+            "death_date",
+            "death_cause",
+            "residence",
+            "notes",
+        )
 
     async def add_martyr_button(self, update: Update, context: CallbackContext):
         user_id = update.effective_user.id
-        if self.database_manager.is_blocked(user_id):
+        if await self.database_manager.is_blocked(user_id):
             await context.bot.send_message(
                 update.effective_chat.id, "أنت محظور من استخدام هذا البوت."
             )
@@ -36,7 +65,7 @@ class MartyrHandlers:
 
     async def check_martyr_exists(self, update: Update, context: CallbackContext):
         martyr_name = update.message.text.strip()
-        martyr = self.database_manager.search_martyr(martyr_name)
+        martyr = await self.database_manager.search_martyr(martyr_name)
         if martyr:
             await context.bot.send_message(
                 update.effective_chat.id,
@@ -63,29 +92,30 @@ class MartyrHandlers:
         return States.PROCESS_SEARCH_MARTYR
 
     async def process_search_martyr(self, update: Update, context: CallbackContext):
+        if rate_limiter.is_limited(update.effective_user.id, "search"):
+            await context.bot.send_message(
+                update.effective_chat.id,
+                "لقد تجاوزت عدد عمليات البحث المسموح بها. يرجى المحاولة لاحقاً.",
+            )
+            return ConversationHandler.END
+
         martyr_name = update.message.text.strip()
-        martyr = self.database_manager.search_martyr(martyr_name)
-        print(martyr)
+        results = await self.database_manager.search_martyrs(
+            martyr_name, self.SEARCH_RESULTS_LIMIT
+        )
+        martyr = results[0] if results else None
         if martyr:
-            martyr_info = (
-                "<b>معلومات الشهيد:</b>\n"
-                f"الاسم: {martyr['name']}\n"
-                f"اسم الأم: {martyr['mother_name']}\n"
-                f"تاريخ الميلاد: {martyr['birth_date']}\n"
-                f"تاريخ الوفاة: {martyr['death_date']}\n"
-                f"سبب الوفاة: {martyr['death_cause']}\n"
-                f"مكان الإقامة: {martyr['residence']}\n"
-                f"ملاحظات: {martyr.get('notes', 'لا يوجد')}\n"
-            )
-            if martyr["photo"]:
+            martyr_info = render_card(martyr, "card")
+            if martyr["photo"] or martyr["photo_file_id"]:
                 try:
-                    with open(martyr["photo"], "rb") as photo_file:
-                        await context.bot.send_photo(
-                            update.effective_chat.id,
-                            photo_file,
-                            caption=martyr_info,
-                            parse_mode="HTML",
-                        )
+                    await send_martyr_photo(
+                        context.bot,
+                        self.database_manager,
+                        update.effective_chat.id,
+                        martyr,
+                        caption=render_card(martyr, "card", caption=True),
+                        parse_mode="HTML",
+                    )
                 except FileNotFoundError:
                     await context.bot.send_message(
                         update.effective_chat.id,
@@ -104,12 +134,79 @@ class MartyrHandlers:
                 await context.bot.send_message(
                     update.effective_chat.id, martyr_info, parse_mode="HTML"
                 )
+
+            if len(results) > 1:
+                similar_names = "\n".join(f"- {other['name']}" for other in results[1:])
+                await context.bot.send_message(
+                    update.effective_chat.id,
+                    f"نتائج مشابهة:\n{similar_names}",
+                )
         else:
             await context.bot.send_message(
                 update.effective_chat.id, "لم يتم العثور على شهيد بهذا الاسم."
             )
         return ConversationHandler.END
 
+    async def handle_inline_query(self, update: Update, context: CallbackContext):
+        """Schedules the answer to an inline query after INLINE_DEBOUNCE seconds.
+
+        Each keystroke sends a new query, so a newer query from the same
+        user cancels the pending answer to the previous one. The wait runs
+        on the job queue, so it holds no update processing slot.
+        """
+        inline_query = update.inline_query
+        name = f"inline_query_{inline_query.from_user.id}"
+        for job in context.job_queue.get_jobs_by_name(name):
+            job.schedule_removal()
+        context.job_queue.run_once(
+            self._answer_inline_query, self.INLINE_DEBOUNCE, data=inline_query, name=name
+        )
+
+    async def _answer_inline_query(self, context: CallbackContext):
+        """Answers with ranked approved martyrs, a page at a time.
+
+        The ranked window of INLINE_MAX_RESULTS is fetched once and served
+        from the search cache while the user scrolls through pages.
+        """
+        inline_query = context.job.data
+        text = inline_query.query.strip()
+        offset = int(inline_query.offset) if inline_query.offset.isdigit() else 0
+        martyrs = []
+        if text:
+            martyrs = await self.database_manager.search_martyrs(
+                text, self.INLINE_MAX_RESULTS
+            )
+        page = martyrs[offset : offset + self.INLINE_PAGE_SIZE]
+        next_offset = offset + self.INLINE_PAGE_SIZE
+        await inline_query.answer(
+            [self._inline_result(martyr) for martyr in page],
+            cache_time=self.INLINE_CACHE_TIME,
+            next_offset=str(next_offset) if next_offset < len(martyrs) else "",
+        )
+
+    def _inline_result(self, martyr):
+        description = " - ".join(
+            filter(None, [martyr["death_date"], martyr["residence"]])
+        )
+        # Only photos already on Telegram can be shown; inline results cannot upload.
+        if martyr["photo_file_id"]:
+            return InlineQueryResultCachedPhoto(
+                id=str(martyr["id"]),
+                photo_file_id=martyr["photo_file_id"],
+                title=martyr["name"],
+                description=description or None,
+                caption=render_card(martyr, "card", caption=True),
+                parse_mode="HTML",
+            )
+        return InlineQueryResultArticle(
+            id=str(martyr["id"]),
+            title=martyr["name"],
+            description=description or None,
+            input_message_content=InputTextMessageContent(
+                render_card(martyr, "card"), parse_mode="HTML"
+            ),
+        )
+
     async def _handle_mother_name(self, update: Update, context: CallbackContext):
         if len(update.message.text) > self.MAX_TEXT_LENGTH:
             await context.bot.send_message(
@@ -128,7 +225,9 @@ class MartyrHandlers:
         birth_date = update.message.text
         if DateValidator.validate_date(birth_date):
             if not DateValidator.is_future_date(birth_date):
-                context.user_data["martyr_data"]["birth_date"] = birth_date
+                context.user_data["martyr_data"]["birth_date"] = DateValidator.normalize_date(
+                    birth_date
+                )
                 await context.bot.send_message(
                     update.effective_chat.id, "يرجى إدخال تاريخ الوفاة (YYYY-MM-DD):"
                 )
@@ -150,7 +249,9 @@ class MartyrHandlers:
         death_date = update.message.text
         if DateValidator.validate_date(death_date):
             if not DateValidator.is_future_date(death_date):
-                context.user_data["martyr_data"]["death_date"] = death_date
+                context.user_data["martyr_data"]["death_date"] = DateValidator.normalize_date(
+                    death_date
+                )
                 await context.bot.send_message(
                     update.effective_chat.id, "يرجى إدخال سبب الوفاة:"
                 )
@@ -211,19 +312,26 @@ class MartyrHandlers:
         await self.show_display_info(update, context)
         return States.STATE_DISPLAY
 
+    async def _store_photo(self, update: Update, context: CallbackContext):
+        """Stores the uploaded photo and points the draft at it."""
+        photo_file = await update.message.photo[-1].get_file()
+        photo_data = bytes(await photo_file.download_as_bytearray())
+        photo_path = photo_store.path_for(photo_store.digest(photo_data))
+        await self.database_manager.register_photo(photo_path)
+        await asyncio.to_thread(photo_store.save, photo_data, photo_path)
+        context.application.create_task(photo_processor.process(photo_path))
+
+        context.user_data["martyr_data"]["photo"] = photo_path
+        context.user_data["martyr_data"]["photo_file_id"] = (
+            display_photo_size(update.message.photo).file_id
+        )
+        await context.bot.delete_message(
+            update.effective_chat.id, update.message.message_id
+        )
+
     async def handle_photo(self, update: Update, context: CallbackContext):
         try:
-            os.makedirs(config.UPLOAD_PATH, exist_ok=True)
-            photo_file = await update.message.photo[-1].get_file()
-            photo_name = f"{uuid.uuid4()}.jpg"
-            photo_path = os.path.join(config.UPLOAD_PATH, photo_name)
-
-            await photo_file.download_to_drive(photo_path)
-
-            context.user_data["martyr_data"]["photo"] = photo_path
-            await context.bot.delete_message(
-                update.effective_chat.id, update.message.message_id
-            )
+            await self._store_photo(update, context)
             markup = InlineKeyboardMarkup(
                 inline_keyboard=[
                     [InlineKeyboardButton(
@@ -265,22 +373,31 @@ class MartyrHandlers:
         query = update.callback_query
         await query.answer("جاري ارسال البيانات")
         if query.data == "confirm":
-            admin_user_id = config.ADMIN_USER_ID
-            if admin_user_id:
-                await self.send_data_to_admin(update, context, admin_user_id)
+            data = context.user_data["martyr_data"]
+            data["submitted_by"] = update.effective_user.id
+            martyr = await self.database_manager.save_martyr_data(data)
+            if not martyr:
                 await context.bot.send_message(
                     update.effective_chat.id,
-                    "تم إرسال البيانات إلى المسؤول للمراجعة.",
+                    "حدث خطأ أثناء حفظ البيانات. يرجى المحاولة مرة أخرى.",
                     reply_markup=ReplyKeyboardRemove(),
                 )
                 return ConversationHandler.END
-            else:
-                await context.bot.send_message(
-                    update.effective_chat.id,
-                    "لم يتم العثور على معرف المسؤول يرجى المحاولة مرة أخرى",
-                    reply_markup=ReplyKeyboardRemove(),
+
+            del context.user_data["martyr_data"]
+            await context.bot.send_message(
+                update.effective_chat.id,
+                "تم إرسال البيانات إلى المسؤول للمراجعة.",
+                reply_markup=ReplyKeyboardRemove(),
+            )
+            admin_user_id = config.ADMIN_USER_ID
+            if admin_user_id:
+                # The admin chat is rate limited; don't hold an update slot
+                # while the notification waits its turn.
+                context.application.create_task(
+                    self.send_data_to_admin(update, context, admin_user_id, martyr)
                 )
-                return ConversationHandler.END
+            return ConversationHandler.END
         elif query.data == "edit":
             await self.show_edit_options(update, context)
             return States.STATE_EDIT
@@ -293,43 +410,23 @@ class MartyrHandlers:
             return States.STATE_CONFIRM
 
     async def send_data_to_admin(
-        self, update: Update, context: CallbackContext, config_admin_user_id
+        self, update: Update, context: CallbackContext, config_admin_user_id, data
     ):
-        data = context.user_data["martyr_data"]
-        message_text = (
-            "<b>معلومات الشهيد (للمراجعة):</b>\n\n"
-            f"الاسم: {data['name']}\n"
-            f"اسم الأم: {data['mother_name']}\n"
-            f"تاريخ الميلاد: {data['birth_date']}\n"
-            f"تاريخ الوفاة: {data['death_date']}\n"
-            f"سبب الوفاة: {data['death_cause']}\n"
-            f"مكان الإقامة: {data['residence']}\n"
-            f"ملاحظات: {data.get('notes', 'لا يوجد')}\n"
-        )
-        markup = InlineKeyboardMarkup(
-            inline_keyboard=[
-                [
-                    InlineKeyboardButton(
-                        "الموافقة", callback_data=f"approve_{update.effective_user.id}"
-                    ),
-                    InlineKeyboardButton(
-                        "الرفض", callback_data=f"reject_{update.effective_user.id}"
-                    ),
-                ]
-            ]
-        )
+        """Notifies the admin of a pending submission saved as ``data``."""
+        message_text = render_card(data, "review")
+        markup = self._review_markup(data["id"])
         try:
-            if "photo" in data and data["photo"]:
-                photo_path = data["photo"]
-                if os.path.exists(photo_path):
-                    with open(photo_path, "rb") as photo_file:
-                        await context.bot.send_photo(
-                            config_admin_user_id,
-                            photo_file,
-                            caption=message_text,
-                            parse_mode="HTML",
-                            reply_markup=markup,
-                        )
+            if data.get("photo") or data.get("photo_file_id"):
+                if data.get("photo_file_id") or os.path.exists(data["photo"]):
+                    await send_martyr_photo(
+                        context.bot,
+                        self.database_manager,
+                        config_admin_user_id,
+                        data,
+                        caption=render_card(data, "review", caption=True),
+                        parse_mode="HTML",
+                        reply_markup=markup,
+                    )
                 else:
                     await context.bot.send_message(
                         update.effective_chat.id,
@@ -353,52 +450,93 @@ class MartyrHandlers:
                 reply_markup=ReplyKeyboardRemove(),
             )
 
+    def _review_markup(self, martyr_id):
+        return InlineKeyboardMarkup(
+            inline_keyboard=[
+                [
+                    InlineKeyboardButton(
+                        "الموافقة", callback_data=f"approve_{martyr_id}"
+                    ),
+                    InlineKeyboardButton(
+                        "الرفض", callback_data=f"reject_{martyr_id}"
+                    ),
+                ]
+            ]
+        )
+
+    def _rejection_reasons_markup(self, martyr_id):
+        keyboard = [
+            [InlineKeyboardButton(reason, callback_data=f"reject_{martyr_id}_{code}")]
+            for code, reason in self.REJECTION_REASONS.items()
+        ]
+        keyboard.append(
+            [InlineKeyboardButton("العودة", callback_data=f"reject_{martyr_id}_back")]
+        )
+        return InlineKeyboardMarkup(keyboard)
+
     async def handle_admin_approval(self, update: Update, context: CallbackContext):
+        """Approves or rejects the pending submission whose id is in the callback.
+
+        ``reject_<id>`` first asks for a reason; the reason buttons send
+        ``reject_<id>_<reason code>``.
+        """
         query = update.callback_query
         await query.answer()
         admin_id = query.from_user.id
-        if not self.database_manager.is_admin(admin_id):
+        if not await self.database_manager.is_admin(admin_id):
             await context.bot.send_message(
                 update.effective_chat.id, "ليس لديك صلاحية لتنفيذ هذا الإجراء."
             )
             return
 
-        action, user_id = query.data.split("_", 1)
-        user_id = int(user_id)
+        action, martyr_id, *reason_code = query.data.split("_")
+        martyr_id = int(martyr_id)
+        reason_code = reason_code[0] if reason_code else None
 
         try:
-            if action == "approve":
-                data = context.user_data["martyr_data"]
-                success = self.database_manager.save_martyr_data(data)
-                if success:
-                    await context.bot.send_message(
-                        user_id,
-                        "تمت الموافقة على بياناتك وحفظها.",
-                        reply_markup=ReplyKeyboardRemove(),
-                    )
-                else:
-                    await context.bot.send_message(
-                        user_id,
-                        "حدث خطأ أثناء حفظ البيانات أو أن الشهيد موجود بالفعل.",
-                        reply_markup=ReplyKeyboardRemove(),
-                    )
-            elif action == "reject":
+            martyr = await self.database_manager.get_martyr(martyr_id)
+            if not martyr or martyr["status"] != "pending":
+                await query.edit_message_reply_markup(reply_markup=None)
                 await context.bot.send_message(
-                    user_id,
-                    "تم رفض بياناتك. يرجى المحاولة مرة أخرى.",
-                    reply_markup=ReplyKeyboardRemove(),
+                    update.effective_chat.id, "تمت معالجة هذا الطلب مسبقاً."
+                )
+                return
+
+            if action == "reject" and reason_code in (None, "back"):
+                markup = (
+                    self._rejection_reasons_markup(martyr_id)
+                    if reason_code is None
+                    else self._review_markup(martyr_id)
                 )
+                await query.edit_message_reply_markup(reply_markup=markup)
+                return
+
+            if action == "approve":
+                success = await self.database_manager.approve_martyr(martyr_id)
+                user_message = "تمت الموافقة على بياناتك وحفظها."
+            elif action == "reject" and reason_code in self.REJECTION_REASONS:
+                reason = self.REJECTION_REASONS[reason_code]
+                success = await self.database_manager.reject_martyr(martyr_id, reason)
+                user_message = f"تم رفض بياناتك ({reason}). يرجى المحاولة مرة أخرى."
             else:
                 await context.bot.send_message(
                     update.effective_chat.id, "خطأ غير متوقع."
                 )
+                return
 
-            del context.user_data["martyr_data"]
-            await context.bot.edit_message_reply_markup(
-                chat_id=query.message.chat.id,
-                message_id=query.message.message_id,
-                reply_markup=None,
-            )
+            if not success:
+                await context.bot.send_message(
+                    update.effective_chat.id, "حدث خطأ أثناء حفظ البيانات."
+                )
+                return
+
+            if martyr["submitted_by"]:
+                await context.bot.send_message(
+                    martyr["submitted_by"],
+                    user_message,
+                    reply_markup=ReplyKeyboardRemove(),
+                )
+            await query.edit_message_reply_markup(reply_markup=None)
             await context.bot.send_message(
                 update.effective_chat.id, "تم تنفيذ الإجراء."
             )
@@ -462,6 +600,7 @@ class MartyrHandlers:
             return States.STATE_CONFIRM
         elif data == "skip_photo":
             context.user_data["martyr_data"]["photo"] = None
+            context.user_data["martyr_data"]["photo_file_id"] = None
             markup = InlineKeyboardMarkup(
                 inline_keyboard=[
                     [InlineKeyboardButton(
@@ -481,7 +620,12 @@ class MartyrHandlers:
         elif data == "back":
             await self.show_display_info(update, context)
             return States.STATE_DISPLAY
-        elif data.startswith("edit_"):
+        elif data == "edit_photo":
+            await context.bot.send_message(
+                update.effective_chat.id, "يرجى إرسال الصورة الجديدة:"
+            )
+            return States.EDIT_PHOTO
+        elif data.startswith("edit_") and data[5:] in self.EDITABLE_FIELDS:
             field = data[5:]
             await context.bot.send_message(
                 update.effective_chat.id, f"أدخل {field} جديد:"
@@ -496,23 +640,44 @@ class MartyrHandlers:
 
     async def edit_field(self, update: Update, context: CallbackContext):
         field = context.user_data.get("edit_field")
+        if field not in self.EDITABLE_FIELDS:
+            await self.show_display_info(update, context)
+            return States.STATE_DISPLAY
         text = update.message.text.strip()
+        if field in ("birth_date", "death_date"):
+            date = DateValidator.normalize_date(text)
+            if date is None or DateValidator.is_future_date(date):
+                await context.bot.send_message(
+                    update.effective_chat.id,
+                    "التاريخ غير صحيح. يرجى إدخاله بالتنسيق YYYY-MM-DD:",
+                )
+                return States.EDIT_FIELD
+            text = date
         context.user_data["martyr_data"][field] = text
         await self.show_display_info(update, context)
         return States.STATE_DISPLAY
 
+    async def edit_photo(self, update: Update, context: CallbackContext):
+        """Replaces the draft's photo; only an uploaded photo is accepted."""
+        if not update.message.photo:
+            await context.bot.send_message(
+                update.effective_chat.id, "يرجى إرسال صورة وليس نصاً:"
+            )
+            return States.EDIT_PHOTO
+        try:
+            await self._store_photo(update, context)
+        except Exception as e:
+            logger.exception(f"Error handling photo: {e}")
+            await context.bot.send_message(
+                update.effective_chat.id, "حدث خطأ أثناء معالجة الصورة."
+            )
+            return States.EDIT_PHOTO
+        await self.show_display_info(update, context)
+        return States.STATE_DISPLAY
+
     async def show_display_info(self, update: Update, context: CallbackContext):
         data = context.user_data["martyr_data"]
-        message_text = (
-            "<b>معلومات الشهيد:</b>\n\n"
-            f"الاسم: {data['name']}\n"
-            f"اسم الأم: {data['mother_name']}\n"
-            f"تاريخ الميلاد: {data['birth_date']}\n"
-            f"تاريخ الوفاة: {data['death_date']}\n"
-            f"سبب الوفاة: {data['death_cause']}\n"
-            f"مكان الإقامة: {data['residence']}\n"
-            f"ملاحظات: {data.get('notes', 'لا يوجد')}\n"
-        )
+        message_text = render_card(data, "card")
         markup = InlineKeyboardMarkup(
             inline_keyboard=[
                 [
@@ -521,18 +686,18 @@ class MartyrHandlers:
                 ]
             ]
         )
-        if "photo" in data and data["photo"]:
-            photo_path = data["photo"]
-            if os.path.exists(photo_path):
+        if data.get("photo") or data.get("photo_file_id"):
+            if data.get("photo_file_id") or os.path.exists(data["photo"]):
                 try:
-                    with open(photo_path, "rb") as photo_file:
-                        await context.bot.send_photo(
-                            update.effective_chat.id,
-                            photo_file,
-                            caption=message_text,
-                            parse_mode="HTML",
-                            reply_markup=markup,
-                        )
+                    await send_martyr_photo(
+                        context.bot,
+                        self.database_manager,
+                        update.effective_chat.id,
+                        data,
+                        caption=render_card(data, "card", caption=True),
+                        parse_mode="HTML",
+                        reply_markup=markup,
+                    )
                 except FileNotFoundError:
                     await context.bot.send_message(
                         update.effective_chat.id,
@@ -3,11 +3,20 @@ from telegram.ext import (
     CommandHandler,
     MessageHandler,
     CallbackQueryHandler,
+    InlineQueryHandler,
+    TypeHandler,
     filters,
 )
 from utils.config import config
-from utils.database import database_manager
-from handlers.bot import BotHandlers, States, logging, Update, ConversationHandler
+from utils.asyncDatabase import async_database_manager as database_manager
+from utils.states import States
+from utils.photoSender import backfill_photo_file_ids
+from utils.photoStore import photo_store
+from utils.photoProcessor import photo_processor
+from utils.persistence import SQLitePersistence
+from utils.updateProcessor import PerUserUpdateProcessor
+from utils.sendQueue import OutboundRateLimiter
+from handlers.bot import BotHandlers, logging, Update, ConversationHandler
 
 
 logging.basicConfig(
@@ -17,18 +26,116 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
-def main():
-    application = ApplicationBuilder().token(config.BOT_TOKEN).build()
+HANDLER_UPDATE_TYPES = (
+    (CallbackQueryHandler, Update.CALLBACK_QUERY),
+    (InlineQueryHandler, Update.INLINE_QUERY),
+    (MessageHandler, Update.MESSAGE),
+    (CommandHandler, Update.MESSAGE),
+)
+
+
+def allowed_updates(application):
+    """Returns the update types that some registered handler can process.
+
+    TypeHandlers (the guard) accept anything and are ignored, so Telegram
+    only sends what the bot actually handles.
+    """
+    update_types = set()
+    pending = [
+        handler for handlers in application.handlers.values() for handler in handlers
+    ]
+    while pending:
+        handler = pending.pop()
+        if isinstance(handler, ConversationHandler):
+            pending.extend(handler.entry_points)
+            pending.extend(handler.fallbacks)
+            for state_handlers in handler.states.values():
+                pending.extend(state_handlers)
+            continue
+        for handler_type, update_type in HANDLER_UPDATE_TYPES:
+            if isinstance(handler, handler_type):
+                update_types.add(update_type)
+    return sorted(update_types)
+
+
+async def post_init(application):
+    await database_manager.connect()
+    photo_processor.start()
+    if config.FIRST_ADMIN_ID:
+        try:
+            admin_id = int(config.FIRST_ADMIN_ID)
+            await database_manager.add_admin(admin_id)
+            logger.info(f"Added first admin with ID: {admin_id}")
+        except ValueError:
+            logger.error(
+                "FIRST_ADMIN_ID في ملف config يجب أن يكون رقمًا صحيحًا.")
+        except Exception as e:
+            logger.error(f"Failed to add first admin: {e}")
+
+    if config.PHOTO_BACKFILL_CHAT_ID:
+        application.create_task(
+            backfill_photo_file_ids(
+                application.bot, database_manager, config.PHOTO_BACKFILL_CHAT_ID
+            )
+        )
+
+
+async def collect_orphan_photos(context):
+    # Drafts, restored from persistence, can outlive PHOTO_ORPHAN_MAX_AGE.
+    drafts = (
+        data.get("martyr_data") or {}
+        for data in context.application.user_data.values()
+    )
+    await database_manager.collect_orphan_photos(
+        config.PHOTO_ORPHAN_MAX_AGE,
+        photo_store.delete,
+        keep={draft["photo"] for draft in drafts if draft.get("photo")},
+    )
+
+
+async def purge_rejected_martyrs(context):
+    await database_manager.purge_rejected_martyrs(config.REJECTED_RETENTION)
+
+
+async def post_shutdown(application):
+    photo_processor.shutdown()
+    await database_manager.close()
+
+
+def build_application():
+    application = (
+        ApplicationBuilder()
+        .token(config.BOT_TOKEN)
+        .concurrent_updates(PerUserUpdateProcessor(config.CONCURRENT_UPDATES))
+        .rate_limiter(
+            OutboundRateLimiter(
+                config.SEND_LIMIT_OVERALL,
+                config.SEND_LIMIT_PRIVATE_CHAT,
+                config.SEND_LIMIT_GROUP_CHAT,
+                max_retries=config.SEND_MAX_RETRIES,
+            )
+        )
+        .persistence(
+            SQLitePersistence(database_manager, config.PERSISTENCE_FLUSH_INTERVAL)
+        )
+        .post_init(post_init)
+        .post_shutdown(post_shutdown)
+        .build()
+    )
     bot_handlers = BotHandlers(database_manager)
 
+    application.add_handler(TypeHandler(Update, bot_handlers.guard_update), group=-1)
+
     application.add_handler(CommandHandler("start", bot_handlers.start))
     application.add_handler(CommandHandler("cancel", bot_handlers.cancel))
 
     martyr_conversation_handler = ConversationHandler(
+        name="martyr_conversation",
+        persistent=True,
         entry_points=[
             MessageHandler(
-                filters.Regex("^(إضافة شهيد)$"),
-                bot_handlers.martyr_handler.add_martyr_button,
+                filters.Text(bot_handlers.menu_texts("martyr_conversation")),
+                bot_handlers.handle_text,
             )
         ],
         states={
@@ -91,6 +198,12 @@ def main():
                     bot_handlers.martyr_handler.edit_field,
                 )
             ],
+            States.EDIT_PHOTO: [
+                MessageHandler(
+                    filters.PHOTO | (filters.TEXT & ~filters.COMMAND),
+                    bot_handlers.martyr_handler.edit_photo,
+                )
+            ],
             States.STATE_DISPLAY: [
                 CallbackQueryHandler(
                     bot_handlers.martyr_handler.handle_edit_callback)
@@ -101,38 +214,51 @@ def main():
     )
     application.add_handler(martyr_conversation_handler)
 
+    # Reply-keyboard buttons; free-text prompts must not swallow them.
+    menu_buttons = filters.Text(frozenset(bot_handlers.menu_commands))
+
     admin_conversation_handler = ConversationHandler(
+        name="admin_conversation",
+        persistent=True,
         entry_points=[
             MessageHandler(
-                filters.Regex("^(لوحة التحكم)$"),
-                bot_handlers.admin_panel_handler.show_admin_panel,
-            )
+                filters.Text(bot_handlers.menu_texts("admin_conversation")),
+                bot_handlers.handle_text,
+            ),
         ],
         states={
             States.PROCESS_ADMIN_ACTION: [
                 MessageHandler(
-                    filters.TEXT & ~filters.COMMAND,
-                    bot_handlers.admin_panel_handler.process_add_admin,
+                    filters.TEXT & ~filters.COMMAND & ~menu_buttons,
+                    bot_handlers.admin_panel_handler.process_admin_action,
                 )
             ],
-            States.HANDLE_PENDING_MARTYR_SELECTION: [
-                CallbackQueryHandler(
-                    bot_handlers.admin_panel_handler.handle_pending_martyr_selection,
-                ),
-                CallbackQueryHandler(
-                    bot_handlers.admin_panel_handler.handle_admin_approval_from_list,
-                ),
+            States.IMPORT_DOCUMENT: [
+                MessageHandler(
+                    filters.Document.ALL,
+                    bot_handlers.admin_panel_handler.handle_import_document,
+                )
             ],
         },
-        fallbacks=[CommandHandler("cancel", bot_handlers.cancel)],
+        fallbacks=[
+            CommandHandler("cancel", bot_handlers.cancel),
+            # Buttons outside the conversation run and end it.
+            MessageHandler(menu_buttons, bot_handlers.handle_text),
+        ],
+        # Another admin button always starts over, and an abandoned prompt
+        # does not keep capturing the admin's next message.
+        allow_reentry=True,
+        conversation_timeout=config.ADMIN_CONVERSATION_TIMEOUT,
     )
     application.add_handler(admin_conversation_handler)
 
     search_conversation_handler = ConversationHandler(
+        name="search_conversation",
+        persistent=True,
         entry_points=[
             MessageHandler(
-            filters.Regex("^(البحث عن شهيد)$"),
-            bot_handlers.martyr_handler.search_martyr_button,
+                filters.Text(bot_handlers.menu_texts("search_conversation")),
+                bot_handlers.handle_text,
             )
         ],
         states={
@@ -148,52 +274,45 @@ def main():
     application.add_handler(search_conversation_handler)
     
     application.add_handler(
-        MessageHandler(
-            filters.Regex("^(عرض قائمة الشهداء)$"),
-            bot_handlers.admin_panel_handler.show_all_martyrs,
+        CallbackQueryHandler(
+            bot_handlers.martyr_handler.handle_admin_approval,
+            pattern="^approve_|^reject_",
         )
     )
     application.add_handler(
-        MessageHandler(
-            filters.Regex("^(عرض الشهداء المعلقة)$"),
+        CallbackQueryHandler(
             bot_handlers.admin_panel_handler.show_pending_martyrs,
+            pattern="^pending_list$",
         )
     )
     application.add_handler(
-        MessageHandler(
-            filters.Regex("^(إضافة مسؤول)$"),
-            bot_handlers.admin_panel_handler.add_admin_button,
-        )
-    )
-    application.add_handler(
-        MessageHandler(
-            filters.Regex("^(إزالة مسؤول)$"),
-            bot_handlers.admin_panel_handler.remove_admin_button,
+        CallbackQueryHandler(
+            bot_handlers.admin_panel_handler.handle_pending_martyr_selection,
+            pattern="^review_martyr_|^admin_panel$",
         )
     )
     application.add_handler(
-        MessageHandler(
-            filters.Regex("^(حظر مستخدم)$"),
-            bot_handlers.admin_panel_handler.block_user_button,
+        CallbackQueryHandler(
+            bot_handlers.admin_panel_handler.handle_bulk_review,
+            pattern="^bulk_",
         )
     )
     application.add_handler(
-        MessageHandler(
-            filters.Regex("^(إلغاء حظر مستخدم)$"),
-            bot_handlers.admin_panel_handler.unblock_user_button,
+        CallbackQueryHandler(
+            bot_handlers.admin_panel_handler.handle_export,
+            pattern="^export_(csv|jsonl|zip)$",
         )
     )
     application.add_handler(
-        MessageHandler(
-            filters.Regex("^(العودة إلى القائمة الرئيسية)$"),
-            bot_handlers.show_main_menu,
+        CallbackQueryHandler(
+            bot_handlers.admin_panel_handler.handle_stats,
+            pattern="^stats_(check|rebuild)$",
         )
     )
-
     application.add_handler(
         CallbackQueryHandler(
-            bot_handlers.martyr_handler.handle_admin_approval,
-            pattern="^approve_|^reject_",
+            bot_handlers.admin_panel_handler.handle_martyrs_page,
+            pattern="^martyrs_(next|prev)_",
         )
     )
     application.add_handler(
@@ -203,6 +322,10 @@ def main():
         )
     )
 
+    application.add_handler(
+        InlineQueryHandler(bot_handlers.martyr_handler.handle_inline_query)
+    )
+
     application.add_handler(
         MessageHandler(filters.TEXT & ~filters.COMMAND, bot_handlers.handle_text)
     )
@@ -211,25 +334,36 @@ def main():
 
     application.add_error_handler(bot_handlers.error_handler)
 
+    application.job_queue.run_repeating(
+        collect_orphan_photos, interval=config.PHOTO_GC_INTERVAL, first=60
+    )
+    application.job_queue.run_repeating(
+        purge_rejected_martyrs, interval=config.REJECTED_PURGE_INTERVAL, first=120
+    )
+    return application
+
+
+def main():
+    application = build_application()
+    update_types = allowed_updates(application)
     try:
-        database_manager.connect()
-        if config.FIRST_ADMIN_ID:
-            try:
-                admin_id = int(config.FIRST_ADMIN_ID)
-                database_manager.add_admin(admin_id)
-                logger.info(f"Added first admin with ID: {admin_id}")
-            except ValueError:
-                logger.error(
-                    "FIRST_ADMIN_ID في ملف config يجب أن يكون رقمًا صحيحًا.")
-            except Exception as e:
-                logger.error(f"Failed to add first admin: {e}")
-
-        logger.info("Bot started successfully.")
-        application.run_polling(allowed_updates=Update.ALL_TYPES)
+        logger.info(
+            f"Bot started successfully in {config.BOT_MODE} mode "
+            f"for updates: {', '.join(update_types)}."
+        )
+        if config.BOT_MODE == "webhook":
+            application.run_webhook(
+                listen=config.WEBHOOK_LISTEN,
+                port=config.WEBHOOK_PORT,
+                url_path=config.WEBHOOK_PATH,
+                webhook_url=config.WEBHOOK_URL,
+                secret_token=config.WEBHOOK_SECRET,
+                allowed_updates=update_types,
+            )
+        else:
+            application.run_polling(allowed_updates=update_types)
     except Exception as e:
-        logger.exception("Bot failed to start: {e} ")
-    finally:
-        database_manager.close()
+        logger.exception(f"Bot failed to start: {e} ")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,41 @@
+import re
+
+_DIACRITICS = re.compile("[\u0610-\u061a\u064b-\u065f\u0670\u06d6-\u06ed\u0640]")
+_WHITESPACE = re.compile(r"\s+")
+_LETTERS = str.maketrans(
+    {
+        "أ": "ا",
+        "إ": "ا",
+        "آ": "ا",
+        "ٱ": "ا",
+        "ى": "ي",
+        "ئ": "ي",
+        "ؤ": "و",
+        "ة": "ه",
+    }
+)
+
+
+def normalize_name(text):
+    """Returns the search key of a name.
+
+    Strips diacritics and tatweel, folds alef/hamza variants, alef maqsura
+    and taa marbuta, and collapses whitespace, so spellings that differ only
+    in those details compare equal.
+    """
+    if not text:
+        return ""
+    text = _DIACRITICS.sub("", text)
+    text = text.translate(_LETTERS)
+    return _WHITESPACE.sub(" ", text).strip().casefold()
+
+
+def trigrams(text):
+    """Returns the distinct three-character substrings of each word."""
+    grams = set()
+    for word in text.split(" "):
+        if len(word) < 3:
+            continue
+        for i in range(len(word) - 2):
+            grams.add(word[i:i + 3])
+    return grams
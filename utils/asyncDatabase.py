@@ -0,0 +1,181 @@
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from utils.database import database_manager
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncDatabaseManager:
+    """Awaitable facade over DatabaseManager.
+
+    Calls are handed to worker threads so that sqlite3 I/O (and the fsync
+    behind each commit) never runs on the event loop. Writes are queued on a
+    single writer thread; reads fan out over one thread per reader connection
+    of the underlying pool. Admin and block checks are answered from the
+    in-memory caches without leaving the loop once those are loaded.
+    """
+
+    def __init__(self, database_manager):
+        self.database_manager = database_manager
+        self._writer_executor = None
+        self._reader_executor = None
+
+    async def _submit(self, executor, func, *args):
+        if executor is None:
+            raise RuntimeError("Database workers are not running. Call connect() first.")
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor, partial(func, *args))
+
+    async def _write(self, func, *args):
+        return await self._submit(self._writer_executor, func, *args)
+
+    async def _read(self, func, *args):
+        return await self._submit(self._reader_executor, func, *args)
+
+    @property
+    def connected(self):
+        return self._writer_executor is not None
+
+    async def connect(self):
+        if self.connected:
+            return
+        self._writer_executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="db-writer"
+        )
+        self._reader_executor = ThreadPoolExecutor(
+            max_workers=self.database_manager.readers,
+            thread_name_prefix="db-reader",
+        )
+        await self._write(self.database_manager.connect)
+
+    async def close(self):
+        if self._writer_executor is None:
+            return
+        self._reader_executor.shutdown(wait=True)
+        await self._write(self.database_manager.close)
+        self._writer_executor.shutdown(wait=True)
+        self._writer_executor = None
+        self._reader_executor = None
+
+    async def add_admin(self, user_id):
+        return await self._write(self.database_manager.add_admin, user_id)
+
+    async def remove_admin(self, user_id):
+        return await self._write(self.database_manager.remove_admin, user_id)
+
+    async def is_admin(self, user_id):
+        if self.database_manager.admins.loaded:
+            return self.database_manager.is_admin(user_id)
+        return await self._read(self.database_manager.is_admin, user_id)
+
+    async def block_user(self, user_id):
+        return await self._write(self.database_manager.block_user, user_id)
+
+    async def unblock_user(self, user_id):
+        return await self._write(self.database_manager.unblock_user, user_id)
+
+    async def is_blocked(self, user_id):
+        if self.database_manager.blocked_users.loaded:
+            return self.database_manager.is_blocked(user_id)
+        return await self._read(self.database_manager.is_blocked, user_id)
+
+    async def search_martyr(self, martyr_name):
+        return await self._read(self.database_manager.search_martyr, martyr_name)
+
+    async def get_martyr(self, martyr_id):
+        return await self._read(self.database_manager.get_martyr, martyr_id)
+
+    async def search_martyrs(self, query, limit=10):
+        return await self._read(self.database_manager.search_martyrs, query, limit)
+
+    async def save_martyr_data(self, data):
+        return await self._write(self.database_manager.save_martyr_data, data)
+
+    async def import_martyrs(self, records, status="approved", submitted_by=None):
+        return await self._write(
+            self.database_manager.import_martyrs, records, status, submitted_by
+        )
+
+    async def register_photo(self, path):
+        return await self._write(self.database_manager.register_photo, path)
+
+    async def collect_orphan_photos(self, max_age, remove_file, keep=()):
+        return await self._write(
+            self.database_manager.collect_orphan_photos, max_age, remove_file, keep
+        )
+
+    async def set_photo_file_id(self, martyr_id, file_id):
+        return await self._write(
+            self.database_manager.set_photo_file_id, martyr_id, file_id
+        )
+
+    async def get_photos_without_file_id(self, after_id=0, limit=50):
+        return await self._read(
+            self.database_manager.get_photos_without_file_id, after_id, limit
+        )
+
+    async def load_persistence(self, kind):
+        return await self._read(self.database_manager.load_persistence, kind)
+
+    async def write_persistence(self, upserts, deletes):
+        return await self._write(
+            self.database_manager.write_persistence, upserts, deletes
+        )
+
+    async def approve_martyr(self, martyr_id):
+        return await self._write(self.database_manager.approve_martyr, martyr_id)
+
+    async def reject_martyr(self, martyr_id, reason=None):
+        return await self._write(
+            self.database_manager.reject_martyr, martyr_id, reason
+        )
+
+    async def approve_martyrs(self, martyr_ids):
+        return await self._write(self.database_manager.approve_martyrs, martyr_ids)
+
+    async def reject_martyrs(self, martyr_ids, reason=None):
+        return await self._write(
+            self.database_manager.reject_martyrs, martyr_ids, reason
+        )
+
+    async def purge_rejected_martyrs(self, max_age):
+        return await self._write(
+            self.database_manager.purge_rejected_martyrs, max_age
+        )
+
+    async def get_martyrs_page(
+        self, after_id=None, before_id=None, limit=20, status="approved"
+    ):
+        return await self._read(
+            self.database_manager.get_martyrs_page,
+            after_id,
+            before_id,
+            limit,
+            status,
+        )
+
+    async def export_martyrs(self, write_batch, status="approved", batch_size=500):
+        return await self._read(
+            self.database_manager.export_martyrs, write_batch, status, batch_size
+        )
+
+    async def count_martyrs(self, status="approved"):
+        return await self._read(self.database_manager.count_martyrs, status)
+
+    async def get_martyr_stats(self):
+        return await self._read(self.database_manager.get_martyr_stats)
+
+    async def check_martyr_stats(self):
+        return await self._read(self.database_manager.check_martyr_stats)
+
+    async def rebuild_martyr_stats(self):
+        return await self._write(self.database_manager.rebuild_martyr_stats)
+
+    def cache_stats(self):
+        return self.database_manager.cache_stats()
+
+
+async_database_manager = AsyncDatabaseManager(database_manager)
@@ -14,6 +14,42 @@ class BotConfig:
         self.FIRST_ADMIN_ID = os.getenv("FIRST_ADMIN_ID")
         self.DATABASE_NAME = os.getenv("DATABASE_NAME", "martyrs.db")
         self.UPLOAD_PATH = os.getenv("UPLOAD_PATH", "Upload")
+        self.DATABASE_READERS = max(1, self._get_int("DATABASE_READERS", 4))
+        self.SEARCH_CACHE_SIZE = max(0, self._get_int("SEARCH_CACHE_SIZE", 1024))
+        self.SEARCH_CACHE_TTL = self._get_int("SEARCH_CACHE_TTL", 300)
+        self.PHOTO_BACKFILL_CHAT_ID = os.getenv("PHOTO_BACKFILL_CHAT_ID")
+        self.PHOTO_GC_INTERVAL = self._get_int("PHOTO_GC_INTERVAL", 3600)
+        self.PHOTO_ORPHAN_MAX_AGE = self._get_int("PHOTO_ORPHAN_MAX_AGE", 86400)
+        self.REJECTED_PURGE_INTERVAL = self._get_int("REJECTED_PURGE_INTERVAL", 86400)
+        self.REJECTED_RETENTION = self._get_int("REJECTED_RETENTION", 30 * 86400)
+        self.PHOTO_MAX_SIZE = self._get_int("PHOTO_MAX_SIZE", 1280)
+        self.PHOTO_WORKERS = max(1, self._get_int("PHOTO_WORKERS", 2))
+        self.PERSISTENCE_FLUSH_INTERVAL = self._get_int("PERSISTENCE_FLUSH_INTERVAL", 60)
+        self.RATE_LIMITS = {
+            "message": self._get_rate("RATE_LIMIT_MESSAGE", (10, 5)),
+            # Unrecognized free text; exceeding it blocks the sender.
+            "spam": self._get_rate("RATE_LIMIT_SPAM", (3, 5)),
+            "search": self._get_rate("RATE_LIMIT_SEARCH", (10, 60)),
+            "submission": self._get_rate("RATE_LIMIT_SUBMISSION", (5, 3600)),
+            "admin": self._get_rate("RATE_LIMIT_ADMIN", (60, 60)),
+            "inline": self._get_rate("RATE_LIMIT_INLINE", (60, 60)),
+            # "Slow down" notices sent to a limited user.
+            "notice": self._get_rate("RATE_LIMIT_NOTICE", (1, 60)),
+        }
+        self.ADMIN_CONVERSATION_TIMEOUT = self._get_int("ADMIN_CONVERSATION_TIMEOUT", 600)
+        self.CONCURRENT_UPDATES = max(1, self._get_int("CONCURRENT_UPDATES", 8))
+        self.SEND_LIMIT_OVERALL = self._get_rate("SEND_LIMIT_OVERALL", (30, 1))
+        self.SEND_LIMIT_PRIVATE_CHAT = self._get_rate("SEND_LIMIT_PRIVATE_CHAT", (1, 1))
+        self.SEND_LIMIT_GROUP_CHAT = self._get_rate("SEND_LIMIT_GROUP_CHAT", (20, 60))
+        self.SEND_MAX_RETRIES = max(0, self._get_int("SEND_MAX_RETRIES", 3))
+        self.BOT_MODE = os.getenv("BOT_MODE", "polling").lower()
+        self.WEBHOOK_URL = os.getenv("WEBHOOK_URL")
+        self.WEBHOOK_LISTEN = os.getenv("WEBHOOK_LISTEN", "127.0.0.1")
+        self.WEBHOOK_PORT = self._get_int("WEBHOOK_PORT", 8443)
+        self.WEBHOOK_PATH = os.getenv("WEBHOOK_PATH", "")
+        self.WEBHOOK_SECRET = os.getenv("WEBHOOK_SECRET") or None
+        self.RATE_LIMIT_MAX_ENTRIES = self._get_int("RATE_LIMIT_MAX_ENTRIES", 100000)
+        self.RATE_LIMIT_IDLE_TTL = self._get_int("RATE_LIMIT_IDLE_TTL", 3600)
 
         if not self.ADMIN_USER_ID:
             logger.warning(
@@ -36,5 +72,48 @@ class BotConfig:
                 )
                 self.FIRST_ADMIN_ID = None
 
+        if self.BOT_MODE not in ("polling", "webhook"):
+            logger.error("Invalid BOT_MODE in .env file.  Must be polling or webhook.")
+            self.BOT_MODE = "polling"
+
+        if self.BOT_MODE == "webhook" and not self.WEBHOOK_URL:
+            logger.error("BOT_MODE is webhook but WEBHOOK_URL is not set. Using polling.")
+            self.BOT_MODE = "polling"
+
+        if self.PHOTO_BACKFILL_CHAT_ID:
+            try:
+                self.PHOTO_BACKFILL_CHAT_ID = int(self.PHOTO_BACKFILL_CHAT_ID)
+            except ValueError:
+                logger.error(
+                    "Invalid PHOTO_BACKFILL_CHAT_ID in .env file.  Must be an integer."
+                )
+                self.PHOTO_BACKFILL_CHAT_ID = None
+
+    @staticmethod
+    def _get_int(name, default):
+        value = os.getenv(name)
+        if not value:
+            return default
+        try:
+            return int(value)
+        except ValueError:
+            logger.error(f"Invalid {name} in .env file.  Must be an integer.")
+            return default
+
+    @staticmethod
+    def _get_rate(name, default):
+        """Reads a limit written as "<count>/<seconds>", e.g. "3/5"."""
+        value = os.getenv(name)
+        if not value:
+            return default
+        try:
+            threshold, time_window = value.split("/")
+            return int(threshold), int(time_window)
+        except ValueError:
+            logger.error(
+                f"Invalid {name} in .env file.  Must be written as <count>/<seconds>."
+            )
+            return default
+
 
 config = BotConfig()
@@ -1,74 +1,158 @@
+import queue
 import sqlite3
 import logging
+import threading
+import time
+from contextlib import contextmanager
+
+from utils.config import config
+from utils.arabicNormalizer import normalize_name, trigrams
+from utils.migrations import STATS_DIMENSIONS, STATUSES, migrate, stats_query
+from utils.searchCache import SearchCache
+from utils.userCache import UserSetCache
 
 logger = logging.getLogger(__name__)
 
 
 class DatabaseManager:
-    def __init__(self, db_name="martyrs.db"):
+    """SQLite access through a small connection pool.
+
+    The database runs in WAL mode so readers never wait for the writer. All
+    writes go through a single writer connection guarded by a lock, reads
+    borrow one of ``readers`` read-only connections, and every operation uses
+    its own short-lived cursor.
+
+    The admins and blocked_users tables are mirrored in memory (see
+    UserSetCache) so authorization checks do not touch SQLite.
+
+    Names are searched through ``name_normalized`` (see normalize_name), which
+    carries a B-tree index for exact lookups and an FTS5 trigram index for
+    ranked substring and fuzzy search. Search results are cached in a
+    SearchCache that the write methods invalidate.
+    """
+
+    FUZZY_MIN_OVERLAP = 0.5
+    REVIEW_CHUNK_SIZE = 500
+    STATUSES = STATUSES
+
+    def __init__(
+        self, db_name="martyrs.db", readers=4, search_cache_size=1024, search_cache_ttl=300
+    ):
         self.db_name = db_name
-        self.conn = None
-        self.cursor = None
+        self.readers = readers
+        self._writer = None
+        self._write_lock = threading.Lock()
+        self._readers = None
+        self._reader_connections = []
+        self.admins = UserSetCache("admins")
+        self.blocked_users = UserSetCache("blocked_users")
+        self.search_cache = SearchCache(search_cache_size, search_cache_ttl)
+        self.fts_enabled = False
+
+    def _open_connection(self):
+        conn = sqlite3.connect(self.db_name, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA busy_timeout = 5000")
+        return conn
 
     def connect(self):
         try:
-            self.conn = sqlite3.connect(self.db_name)
-            self.cursor = self.conn.cursor()
-            self._create_tables()
-            logger.info("Connected to the database.")
+            self._writer = self._open_connection()
+            self._writer.execute("PRAGMA journal_mode = WAL")
+            self._writer.execute("PRAGMA synchronous = NORMAL")
+            self._migrate()
+            self._load_user_caches()
+
+            self._readers = queue.Queue()
+            for _ in range(self.readers):
+                conn = self._open_connection()
+                conn.execute("PRAGMA query_only = ON")
+                self._reader_connections.append(conn)
+                self._readers.put(conn)
+            logger.info(
+                f"Connected to the database with {self.readers} reader connections."
+            )
         except sqlite3.Error as e:
             logger.error(f"Failed to connect to the database: {e}")
             raise
 
     def close(self):
-        if self.conn:
-            self.conn.close()
+        for conn in self._reader_connections:
+            conn.close()
+        self._reader_connections = []
+        self._readers = None
+        self.admins.clear()
+        self.blocked_users.clear()
+        self.search_cache.clear()
+        if self._writer:
+            self._writer.close()
+            self._writer = None
             logger.info("Disconnected from the database.")
 
-    def _create_tables(self):
+    @contextmanager
+    def _read(self):
+        """Borrows a reader connection and yields a fresh cursor on it."""
+        conn = self._readers.get()
         try:
-            self.cursor.execute(
-                """
-                CREATE TABLE IF NOT EXISTS martyrs (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    name TEXT NOT NULL,
-                    mother_name TEXT,
-                    birth_date TEXT,
-                    death_date TEXT,
-                    death_cause TEXT,
-                    residence TEXT,
-                    photo TEXT,  -- Store the file path
-                    notes TEXT,
-                    approved INTEGER DEFAULT 0 --  0: pending, 1: approved
-                )
-            """
-            )
-            self.cursor.execute(
-                """
-                CREATE TABLE IF NOT EXISTS admins (
-                    user_id INTEGER PRIMARY KEY
-                )
-            """
-            )
-            self.cursor.execute(
-                """
-                CREATE TABLE IF NOT EXISTS blocked_users (
-                    user_id INTEGER PRIMARY KEY
-                )
-            """
-            )
-            self.conn.commit()
-            logger.info("Tables created (if they didn't exist).")
-        except sqlite3.Error as e:
-            logger.error(f"Failed to create tables: {e}")
-            raise
+            cursor = conn.cursor()
+            try:
+                yield cursor
+            finally:
+                cursor.close()
+        finally:
+            self._readers.put(conn)
+
+    @contextmanager
+    def _write(self):
+        """Yields a cursor on the writer connection inside one transaction."""
+        with self._write_lock:
+            cursor = self._writer.cursor()
+            try:
+                yield cursor
+                self._writer.commit()
+            except Exception:
+                self._writer.rollback()
+                raise
+            finally:
+                cursor.close()
+
+    def _migrate(self):
+        with self._write_lock:
+            migrate(self._writer)
+        self.fts_enabled = (
+            self._writer.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'martyrs_fts'"
+            ).fetchone()
+            is not None
+        )
+        if not self.fts_enabled:
+            logger.warning("FTS5 trigram index unavailable, falling back to prefix search.")
+
+    def _load_user_caches(self):
+        with self._write() as cursor:
+            cursor.execute("SELECT user_id FROM admins")
+            self.admins.load(row[0] for row in cursor.fetchall())
+            cursor.execute("SELECT user_id FROM blocked_users")
+            self.blocked_users.load(row[0] for row in cursor.fetchall())
+        logger.info(
+            f"Cached {self.admins.stats()['size']} admins and "
+            f"{self.blocked_users.stats()['size']} blocked users."
+        )
+
+    def cache_stats(self):
+        return [
+            self.admins.stats(),
+            self.blocked_users.stats(),
+            self.search_cache.stats(),
+        ]
 
     def add_admin(self, user_id):
         try:
-            self.cursor.execute(
-                "INSERT OR IGNORE INTO admins (user_id) VALUES (?)", (user_id,)
-            )
-            self.conn.commit()
+            with self._write() as cursor:
+                cursor.execute(
+                    "INSERT OR IGNORE INTO admins (user_id) VALUES (?)", (user_id,)
+                )
+            self.admins.add(user_id)
             logger.info(f"Admin added with ID: {user_id}")
             return True
         except sqlite3.Error as e:
@@ -77,9 +161,10 @@ class DatabaseManager:
 
     def remove_admin(self, user_id):
         try:
-            self.cursor.execute(
-                "DELETE FROM admins WHERE user_id = ?", (user_id,))
-            self.conn.commit()
+            with self._write() as cursor:
+                cursor.execute(
+                    "DELETE FROM admins WHERE user_id = ?", (user_id,))
+            self.admins.discard(user_id)
             logger.info(f"Admin removed with ID: {user_id}")
             return True
         except sqlite3.Error as e:
@@ -87,21 +172,26 @@ class DatabaseManager:
             return False
 
     def is_admin(self, user_id):
+        cached = self.admins.lookup(user_id)
+        if cached is not None:
+            return cached
         try:
-            self.cursor.execute(
-                "SELECT 1 FROM admins WHERE user_id = ?", (user_id,))
-            return self.cursor.fetchone() is not None
+            with self._read() as cursor:
+                cursor.execute(
+                    "SELECT 1 FROM admins WHERE user_id = ?", (user_id,))
+                return cursor.fetchone() is not None
         except sqlite3.Error as e:
             logger.error(f"Failed to check admin status: {e}")
             return False
 
     def block_user(self, user_id):
         try:
-            self.cursor.execute(
-                "INSERT OR IGNORE INTO blocked_users (user_id) VALUES (?)", (
-                    user_id,)
-            )
-            self.conn.commit()
+            with self._write() as cursor:
+                cursor.execute(
+                    "INSERT OR IGNORE INTO blocked_users (user_id) VALUES (?)", (
+                        user_id,)
+                )
+            self.blocked_users.add(user_id)
             logger.info(f"User blocked with ID: {user_id}")
             return True
         except sqlite3.Error as e:
@@ -110,10 +200,11 @@ class DatabaseManager:
 
     def unblock_user(self, user_id):
         try:
-            self.cursor.execute(
-                "DELETE FROM blocked_users WHERE user_id = ?", (user_id,)
-            )
-            self.conn.commit()
+            with self._write() as cursor:
+                cursor.execute(
+                    "DELETE FROM blocked_users WHERE user_id = ?", (user_id,)
+                )
+            self.blocked_users.discard(user_id)
             logger.info(f"User unblocked with ID: {user_id}")
             return True
         except sqlite3.Error as e:
@@ -121,126 +212,604 @@ class DatabaseManager:
             return False
 
     def is_blocked(self, user_id):
+        cached = self.blocked_users.lookup(user_id)
+        if cached is not None:
+            return cached
         try:
-            self.cursor.execute(
-                "SELECT 1 FROM blocked_users WHERE user_id = ?", (user_id,)
-            )
-            return self.cursor.fetchone() is not None
+            with self._read() as cursor:
+                cursor.execute(
+                    "SELECT 1 FROM blocked_users WHERE user_id = ?", (user_id,)
+                )
+                return cursor.fetchone() is not None
         except sqlite3.Error as e:
             logger.error(f"Failed to check blocked status: {e}")
             return False
 
     def search_martyr(self, martyr_name):
+        """Returns the pending or approved martyr named ``martyr_name``, if any.
+
+        Pending rows count so the same martyr is not submitted twice; public
+        search goes through search_martyrs, which shows approved rows only.
+        """
+        key = normalize_name(martyr_name)
+        cached = self.search_cache.get(("exact", key))
+        if cached is not None:
+            return cached[0] if cached else None
+        generation = self.search_cache.generation
         try:
-            self.cursor.execute(
-                "SELECT * FROM martyrs WHERE name = ?", (martyr_name,))
-            row = self.cursor.fetchone()
-            if row:
-                martyr = {
-                    "id": row[0],
-                    "name": row[1],
-                    "mother_name": row[2],
-                    "birth_date": row[3],
-                    "death_date": row[4],
-                    "death_cause": row[5],
-                    "residence": row[6],
-                    "photo": row[7],
-                    "notes": row[8],
-                    "approved": row[9],  # Retrieve approval status
-                }
-                return martyr
-            else:
-                return None
+            with self._read() as cursor:
+                cursor.execute(
+                    "SELECT * FROM martyrs WHERE name_normalized = ? "
+                    "AND status IN ('pending', 'approved') LIMIT 1",
+                    (key,),
+                )
+                row = cursor.fetchone()
         except sqlite3.Error as e:
             logger.error(f"Failed to search for martyr: {e}")
             return None
+        results = [dict(row)] if row else []
+        self.search_cache.put(("exact", key), results, generation)
+        return results[0] if results else None
+
+    def get_martyr(self, martyr_id):
+        try:
+            with self._read() as cursor:
+                cursor.execute("SELECT * FROM martyrs WHERE id = ?", (martyr_id,))
+                row = cursor.fetchone()
+            return dict(row) if row else None
+        except sqlite3.Error as e:
+            logger.error(f"Failed to get martyr: {e}")
+            return None
+
+    def search_martyrs(self, query, limit=10):
+        """Returns up to ``limit`` approved martyrs ranked by how well they match.
+
+        Exact matches on the normalized name come first, then names starting
+        with the query, then other names containing it. If that yields fewer
+        than ``limit`` rows, names sharing most of the query's trigrams are
+        added to tolerate typos.
+
+        Results are kept in ``search_cache`` until they expire or a write
+        touches one of the rows.
+        """
+        key = normalize_name(query)
+        if not key:
+            return []
+        cached = self.search_cache.get(("search", key, limit))
+        if cached is not None:
+            return cached
+        generation = self.search_cache.generation
+        try:
+            with self._read() as cursor:
+                if not self.fts_enabled or len(key) < 3:
+                    results = self._search_prefix(cursor, key, limit)
+                else:
+                    results = self._search_substring(cursor, key, limit)
+                    if len(results) < limit:
+                        seen = {martyr["id"] for martyr in results}
+                        results += self._search_fuzzy(
+                            cursor, key, limit - len(results), seen
+                        )
+        except sqlite3.Error as e:
+            logger.error(f"Failed to search for martyrs: {e}")
+            return []
+        self.search_cache.put(("search", key, limit), results, generation)
+        return results
+
+    def _search_prefix(self, cursor, key, limit):
+        cursor.execute(
+            """
+            SELECT * FROM martyrs
+            WHERE name_normalized >= ? AND name_normalized < ?
+                AND status = 'approved'
+            ORDER BY name_normalized
+            LIMIT ?
+        """,
+            (key, key + "\uffff", limit),
+        )
+        return [dict(row) for row in cursor.fetchall()]
+
+    def _search_substring(self, cursor, key, limit):
+        cursor.execute(
+            """
+            SELECT m.* FROM martyrs_fts
+            JOIN martyrs m ON m.id = martyrs_fts.rowid
+            WHERE martyrs_fts MATCH :phrase AND m.status = 'approved'
+            ORDER BY
+                m.name_normalized = :key DESC,
+                substr(m.name_normalized, 1, length(:key)) = :key DESC,
+                martyrs_fts.rank
+            LIMIT :limit
+        """,
+            {"phrase": '"' + key.replace('"', '""') + '"', "key": key, "limit": limit},
+        )
+        return [dict(row) for row in cursor.fetchall()]
+
+    def _search_fuzzy(self, cursor, key, limit, exclude_ids):
+        query_grams = trigrams(key)
+        if not query_grams:
+            return []
+        cursor.execute(
+            """
+            SELECT m.* FROM martyrs_fts
+            JOIN martyrs m ON m.id = martyrs_fts.rowid
+            WHERE martyrs_fts MATCH ? AND m.status = 'approved'
+            ORDER BY martyrs_fts.rank
+            LIMIT ?
+        """,
+            (
+                " OR ".join('"' + gram.replace('"', '""') + '"' for gram in query_grams),
+                (limit + len(exclude_ids)) * 5,
+            ),
+        )
+        results = []
+        for row in cursor.fetchall():
+            if row["id"] in exclude_ids:
+                continue
+            overlap = len(query_grams & trigrams(row["name_normalized"])) / len(query_grams)
+            if overlap >= self.FUZZY_MIN_OVERLAP:
+                results.append(dict(row))
+                if len(results) == limit:
+                    break
+        return results
 
     def save_martyr_data(self, data):
         try:
-            self.cursor.execute(
-                """
-                INSERT INTO martyrs (name, mother_name, birth_date, death_date, death_cause, residence, photo, notes)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-                (
-                    data["name"],
-                    data["mother_name"],
-                    data["birth_date"],
-                    data["death_date"],
-                    data["death_cause"],
-                    data["residence"],
-                    data.get("photo"),
-                    data.get("notes"),
-                ),
-            )
-            self.conn.commit()
-            row = self.cursor.fetchone()
-            if row:
-                martyr = {
-                    "id": row[0],
-                    "name": row[1],
-                    "mother_name": row[2],
-                    "birth_date": row[3],
-                    "death_date": row[4],
-                    "death_cause": row[5],
-                    "residence": row[6],
-                    "photo": row[7],
-                    "notes": row[8],
-                    "approved": row[9],
-                }
-                return martyr
-            else:
-                return None
+            with self._write() as cursor:
+                cursor.execute(
+                    """
+                    INSERT INTO martyrs (name, name_normalized, mother_name, birth_date, death_date, death_cause, residence, photo, photo_file_id, notes, submitted_by)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                    (
+                        data["name"],
+                        normalize_name(data["name"]),
+                        data["mother_name"],
+                        data["birth_date"],
+                        data["death_date"],
+                        data["death_cause"],
+                        data["residence"],
+                        data.get("photo"),
+                        data.get("photo_file_id"),
+                        data.get("notes"),
+                        data.get("submitted_by"),
+                    ),
+                )
+                cursor.execute(
+                    "SELECT * FROM martyrs WHERE id = ?", (cursor.lastrowid,))
+                row = cursor.fetchone()
+            self.search_cache.clear()
+            return dict(row) if row else None
         except sqlite3.Error as e:
-            logger.error(f"Failed to search for martyr: {e}")
+            logger.error(f"Failed to save martyr data: {e}")
             return None
 
-    def get_pending_martyrs(self):
+    def import_martyrs(self, records, status="approved", submitted_by=None):
+        """Inserts many martyr records in one transaction, skipping duplicates.
+
+        A record is a duplicate when its normalized name is already stored as
+        pending or approved, or appears earlier in ``records``. Returns
+        (number inserted, duplicate names), or None if the transaction failed.
+        """
+        self._status_literal(status)
+        reviewed_at = int(time.time()) if status != "pending" else None
         try:
-            self.cursor.execute(
-                "SELECT id, name FROM martyrs WHERE approved = 0")
-            rows = self.cursor.fetchall()
-            martyrs = [{"id": row[0], "name": row[1]} for row in rows]
-            return martyrs
+            with self._write() as cursor:
+                keys = list({normalize_name(record["name"]) for record in records})
+                existing = set()
+                for start in range(0, len(keys), self.REVIEW_CHUNK_SIZE):
+                    chunk = keys[start : start + self.REVIEW_CHUNK_SIZE]
+                    cursor.execute(
+                        "SELECT name_normalized FROM martyrs "
+                        f"WHERE name_normalized IN ({', '.join('?' * len(chunk))}) "
+                        "AND status IN ('pending', 'approved')",
+                        chunk,
+                    )
+                    existing.update(row[0] for row in cursor.fetchall())
+
+                rows, duplicates = [], []
+                for record in records:
+                    key = normalize_name(record["name"])
+                    if key in existing:
+                        duplicates.append(record["name"])
+                        continue
+                    existing.add(key)
+                    rows.append(
+                        (
+                            record["name"],
+                            key,
+                            record.get("mother_name"),
+                            record.get("birth_date"),
+                            record.get("death_date"),
+                            record.get("death_cause"),
+                            record.get("residence"),
+                            record.get("notes"),
+                            submitted_by,
+                            status,
+                            int(status == "approved"),
+                            reviewed_at,
+                        )
+                    )
+                cursor.executemany(
+                    """
+                    INSERT INTO martyrs (name, name_normalized, mother_name, birth_date, death_date, death_cause, residence, notes, submitted_by, status, approved, reviewed_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                    rows,
+                )
+            if rows:
+                self.search_cache.clear()
+            return len(rows), duplicates
         except sqlite3.Error as e:
-            logger.error(f"Failed to get pending martyrs: {e}")
+            logger.error(f"Failed to import martyrs: {e}")
+            return None
+
+    def register_photo(self, path):
+        """Records a stored photo before any martyr row references it.
+
+        Registering an existing path refreshes its timestamp, which keeps a
+        concurrent collect_orphan_photos from removing it.
+        """
+        try:
+            with self._write() as cursor:
+                cursor.execute(
+                    """
+                    INSERT INTO photos (path, ref_count, updated_at) VALUES (?, 0, ?)
+                    ON CONFLICT (path) DO UPDATE SET updated_at = excluded.updated_at
+                """,
+                    (path, int(time.time())),
+                )
+            return True
+        except sqlite3.Error as e:
+            logger.error(f"Failed to register photo: {e}")
+            return False
+
+    def collect_orphan_photos(self, max_age, remove_file, keep=()):
+        """Deletes photos no martyr row references for at least ``max_age`` seconds.
+
+        Paths in ``keep``, such as photos of unfinished drafts, are left
+        alone however old they are. ``remove_file`` is called with each path
+        while the writer lock is held, so no photo can be registered again
+        halfway through.
+        """
+        keep = set(keep)
+        try:
+            with self._write() as cursor:
+                cursor.execute(
+                    "SELECT path FROM photos WHERE ref_count <= 0 AND updated_at < ?",
+                    (int(time.time()) - max_age,),
+                )
+                paths = [
+                    row["path"] for row in cursor.fetchall() if row["path"] not in keep
+                ]
+                for path in paths:
+                    remove_file(path)
+                cursor.executemany(
+                    "DELETE FROM photos WHERE path = ?", [(path,) for path in paths]
+                )
+            if paths:
+                logger.info(f"Removed {len(paths)} orphaned photos.")
+            return len(paths)
+        except sqlite3.Error as e:
+            logger.error(f"Failed to collect orphaned photos: {e}")
+            return 0
+
+    def set_photo_file_id(self, martyr_id, file_id):
+        try:
+            with self._write() as cursor:
+                cursor.execute(
+                    "UPDATE martyrs SET photo_file_id = ? WHERE id = ?",
+                    (file_id, martyr_id),
+                )
+            self.search_cache.invalidate_ids([martyr_id])
+            return True
+        except sqlite3.Error as e:
+            logger.error(f"Failed to store photo file_id: {e}")
+            return False
+
+    def get_photos_without_file_id(self, after_id=0, limit=50):
+        """Returns (id, photo) of martyrs whose photo was never sent to Telegram."""
+        try:
+            with self._read() as cursor:
+                cursor.execute(
+                    """
+                    SELECT id, photo FROM martyrs
+                    WHERE id > ? AND photo IS NOT NULL AND photo_file_id IS NULL
+                    ORDER BY id LIMIT ?
+                """,
+                    (after_id, limit),
+                )
+                return [dict(row) for row in cursor.fetchall()]
+        except sqlite3.Error as e:
+            logger.error(f"Failed to get photos without file_id: {e}")
+            return []
+
+    def load_persistence(self, kind):
+        """Returns the stored (key, data) pairs of one persistence kind."""
+        try:
+            with self._read() as cursor:
+                cursor.execute(
+                    "SELECT key, data FROM persistence WHERE kind = ?", (kind,)
+                )
+                return [(row["key"], row["data"]) for row in cursor.fetchall()]
+        except sqlite3.Error as e:
+            logger.error(f"Failed to load persisted {kind}: {e}")
             return []
 
+    def write_persistence(self, upserts, deletes):
+        """Writes a batch of persistence changes in a single transaction.
+
+        ``upserts`` holds (kind, key, data) rows and ``deletes`` (kind, key)
+        pairs.
+        """
+        try:
+            with self._write() as cursor:
+                cursor.executemany(
+                    "DELETE FROM persistence WHERE kind = ? AND key = ?", deletes
+                )
+                cursor.executemany(
+                    """
+                    INSERT INTO persistence (kind, key, data) VALUES (?, ?, ?)
+                    ON CONFLICT (kind, key) DO UPDATE SET data = excluded.data
+                """,
+                    upserts,
+                )
+            return True
+        except sqlite3.Error as e:
+            logger.error(f"Failed to write persistence batch: {e}")
+            return False
+
     def approve_martyr(self, martyr_id):
+        return bool(self.approve_martyrs([martyr_id]))
+
+    def reject_martyr(self, martyr_id, reason=None):
+        return bool(self.reject_martyrs([martyr_id], reason))
+
+    def _review_martyrs(self, martyr_ids, statement, params=()):
+        """Runs ``statement`` for every still-pending id in one transaction.
+
+        Each execution gets ``params`` followed by the id. Returns the id,
+        name and submitted_by of the rows it was run for.
+        """
+        martyr_ids = list(dict.fromkeys(martyr_ids))
+        reviewed = []
+        with self._write() as cursor:
+            for start in range(0, len(martyr_ids), self.REVIEW_CHUNK_SIZE):
+                chunk = martyr_ids[start : start + self.REVIEW_CHUNK_SIZE]
+                placeholders = ", ".join("?" * len(chunk))
+                cursor.execute(
+                    "SELECT id, name, submitted_by FROM martyrs "
+                    f"WHERE status = 'pending' AND id IN ({placeholders})",
+                    chunk,
+                )
+                reviewed.extend(dict(row) for row in cursor.fetchall())
+            cursor.executemany(
+                statement, [(*params, martyr["id"]) for martyr in reviewed]
+            )
+        self.search_cache.invalidate_ids(martyr["id"] for martyr in reviewed)
+        return reviewed
+
+    def approve_martyrs(self, martyr_ids):
+        """Approves many pending martyrs at once, see ``_review_martyrs``."""
         try:
-            self.cursor.execute(
-                "UPDATE martyrs SET approved = 1 WHERE id = ?", (martyr_id,)
+            approved = self._review_martyrs(
+                martyr_ids,
+                """
+                UPDATE martyrs SET status = 'approved', approved = 1, reviewed_at = ?
+                WHERE id = ?
+            """,
+                (int(time.time()),),
             )
-            self.conn.commit()
-            logger.info(f"Martyr approved with ID: {martyr_id}")
+            if approved:
+                # Newly approved rows may match any cached query.
+                self.search_cache.clear()
+            logger.info(f"Approved {len(approved)} martyrs.")
+            return approved
+        except sqlite3.Error as e:
+            logger.error(f"Failed to approve martyrs: {e}")
+            return []
+
+    def reject_martyrs(self, martyr_ids, reason=None):
+        """Marks many pending martyrs rejected, see ``_review_martyrs``.
+
+        Rejected rows are kept until purge_rejected_martyrs removes them.
+        """
+        try:
+            rejected = self._review_martyrs(
+                martyr_ids,
+                """
+                UPDATE martyrs
+                SET status = 'rejected', rejection_reason = ?, reviewed_at = ?
+                WHERE id = ?
+            """,
+                (reason, int(time.time())),
+            )
+            logger.info(f"Rejected {len(rejected)} martyrs.")
+            return rejected
+        except sqlite3.Error as e:
+            logger.error(f"Failed to reject martyrs: {e}")
+            return []
+
+    def purge_rejected_martyrs(self, max_age):
+        """Deletes martyrs rejected more than ``max_age`` seconds ago.
+
+        Only the rows are deleted. Their photos lose a reference and are
+        left to collect_orphan_photos, which waits until nothing, drafts
+        included, has used them for its own grace period.
+        """
+        try:
+            with self._write() as cursor:
+                cursor.execute(
+                    "DELETE FROM martyrs WHERE status = 'rejected' AND reviewed_at < ?",
+                    (int(time.time()) - max_age,),
+                )
+                purged = cursor.rowcount
+            if purged:
+                logger.info(f"Purged {purged} rejected martyrs.")
+            return purged
+        except sqlite3.Error as e:
+            logger.error(f"Failed to purge rejected martyrs: {e}")
+            return 0
+
+    def get_martyrs_page(self, after_id=None, before_id=None, limit=20, status="approved"):
+        """Returns one keyset page of martyrs with ``status``, ordered by id.
+
+        Pass the last id of the current page as ``after_id`` for the next page
+        or its first id as ``before_id`` for the previous one. Only the columns
+        needed for the list are selected.
+        """
+        # Inlined rather than bound so the partial index on pending rows applies.
+        status = self._status_literal(status)
+        try:
+            with self._read() as cursor:
+                if before_id is not None:
+                    cursor.execute(
+                        f"""
+                        SELECT id, name, death_date FROM martyrs
+                        WHERE status = {status} AND id < ?
+                        ORDER BY id DESC LIMIT ?
+                    """,
+                        (before_id, limit + 1),
+                    )
+                    rows = cursor.fetchall()
+                    has_prev, has_next = len(rows) > limit, True
+                    rows = list(reversed(rows[:limit]))
+                else:
+                    cursor.execute(
+                        f"""
+                        SELECT id, name, death_date FROM martyrs
+                        WHERE status = {status} AND id > ?
+                        ORDER BY id LIMIT ?
+                    """,
+                        (after_id or 0, limit + 1),
+                    )
+                    rows = cursor.fetchall()
+                    has_next = len(rows) > limit
+                    rows = rows[:limit]
+                    has_prev = False
+                    if after_id:
+                        cursor.execute(
+                            "SELECT EXISTS(SELECT 1 FROM martyrs "
+                            f"WHERE status = {status} AND id <= ?)",
+                            (after_id,),
+                        )
+                        has_prev = bool(cursor.fetchone()[0])
+            return {
+                "martyrs": [dict(row) for row in rows],
+                "has_prev": has_prev,
+                "has_next": has_next,
+            }
+        except sqlite3.Error as e:
+            logger.error(f"Failed to get martyrs page: {e}")
+            return {"martyrs": [], "has_prev": False, "has_next": False}
+
+    def export_martyrs(self, write_batch, status="approved", batch_size=500):
+        """Streams martyrs with ``status`` to ``write_batch`` in id order.
+
+        Rows are fetched ``batch_size`` at a time from one cursor inside one
+        read transaction, so the export is a consistent snapshot and memory
+        does not grow with the table. Returns the number of rows exported, or
+        None on a database error.
+        """
+        status = self._status_literal(status)
+        try:
+            with self._read() as cursor:
+                cursor.execute(
+                    f"""
+                    SELECT id, name, mother_name, birth_date, death_date,
+                        death_cause, residence, notes, photo
+                    FROM martyrs WHERE status = {status} ORDER BY id
+                """
+                )
+                count = 0
+                while rows := cursor.fetchmany(batch_size):
+                    write_batch([dict(row) for row in rows])
+                    count += len(rows)
+            logger.info(f"Exported {count} martyrs.")
+            return count
+        except sqlite3.Error as e:
+            logger.error(f"Failed to export martyrs: {e}")
+            return None
+
+    def count_martyrs(self, status="approved"):
+        status = self._status_literal(status)
+        try:
+            with self._read() as cursor:
+                cursor.execute(f"SELECT COUNT(*) FROM martyrs WHERE status = {status}")
+                return cursor.fetchone()[0]
+        except sqlite3.Error as e:
+            logger.error(f"Failed to count martyrs: {e}")
+            return 0
+
+    def get_martyr_stats(self):
+        """Returns the approved counters as {dimension: [(key, count), ...]}.
+
+        Reads only the martyr_stats table, which triggers keep current, so
+        the cost does not grow with the number of martyrs.
+        """
+        try:
+            with self._read() as cursor:
+                cursor.execute(
+                    "SELECT dimension, key, count FROM martyr_stats "
+                    "ORDER BY dimension, count DESC, key"
+                )
+                stats = {dimension: [] for dimension in STATS_DIMENSIONS}
+                for dimension, key, count in cursor.fetchall():
+                    stats.setdefault(dimension, []).append((key, count))
+                return stats
+        except sqlite3.Error as e:
+            logger.error(f"Failed to get martyr stats: {e}")
+            return None
+
+    def check_martyr_stats(self):
+        """Compares the counters with a full recount.
+
+        Returns a list of (dimension, key, stored, actual) for every counter
+        that differs, or None on error.
+        """
+        try:
+            with self._read() as cursor:
+                # One statement, so both sides come from the same snapshot.
+                cursor.execute(
+                    f"""
+                    SELECT dimension, key, SUM(stored), SUM(actual) FROM (
+                        SELECT dimension, key, count AS stored, 0 AS actual
+                        FROM martyr_stats
+                        UNION ALL
+                        SELECT dimension, key, 0, count FROM ({stats_query()})
+                    )
+                    GROUP BY dimension, key HAVING SUM(stored) != SUM(actual)
+                    ORDER BY dimension, key
+                """
+                )
+                return [tuple(row) for row in cursor.fetchall()]
+        except sqlite3.Error as e:
+            logger.error(f"Failed to check martyr stats: {e}")
+            return None
+
+    def rebuild_martyr_stats(self):
+        """Recounts martyr_stats from the martyrs table in one transaction."""
+        try:
+            with self._write() as cursor:
+                cursor.execute("DELETE FROM martyr_stats")
+                cursor.execute(
+                    f"INSERT INTO martyr_stats (dimension, key, count) {stats_query()}"
+                )
+            logger.info("Rebuilt martyr stats.")
             return True
         except sqlite3.Error as e:
-            logger.error(f"Failed to approve martyr: {e}")
+            logger.error(f"Failed to rebuild martyr stats: {e}")
             return False
 
-    def get_all_martyrs(self):
-        try:
-            self.cursor.execute("SELECT * FROM martyrs WHERE approved = 1")
-            rows = self.cursor.fetchall()
-            martyrs = []
-            for row in rows:
-                martyr = {
-                    "id": row[0],
-                    "name": row[1],
-                    "mother_name": row[2],
-                    "birth_date": row[3],
-                    "death_date": row[4],
-                    "death_cause": row[5],
-                    "residence": row[6],
-                    "photo": row[7],
-                    "notes": row[8],
-                    "approved": row[9],
-                }
-                martyrs.append(martyr)
-            return martyrs
-        except sqlite3.Error as e:
-            logger.error(f"Failed to get all martyrs: {e}")
-        return []
-
-
-database_manager = DatabaseManager()
+    def _status_literal(self, status):
+        if status not in self.STATUSES:
+            raise ValueError(f"Unknown martyr status: {status}")
+        return f"'{status}'"
+
+
+database_manager = DatabaseManager(
+    config.DATABASE_NAME,
+    config.DATABASE_READERS,
+    config.SEARCH_CACHE_SIZE,
+    config.SEARCH_CACHE_TTL,
+)
@@ -20,3 +20,11 @@ class DateValidator:
             return date > today
         except ValueError:
             return False
+
+    @staticmethod
+    def normalize_date(date_text):
+        """Returns a valid date as zero-padded YYYY-MM-DD, otherwise None."""
+        try:
+            return datetime.datetime.strptime(date_text.strip(), "%Y-%m-%d").date().isoformat()
+        except ValueError:
+            return None
@@ -1,31 +1,63 @@
-import datetime
+import time
+from collections import OrderedDict, deque, namedtuple
 
+from utils.config import config
 
-class SpamFilter:
-    def __init__(self, threshold=3, time_window=5):
-        self.threshold = threshold
-        self.time_window = time_window
-        self.user_messages = {}
 
-    def is_spam(self, message):
-        user_id = message.from_user.id
-        now = message.date
-        if user_id not in self.user_messages:
-            self.user_messages[user_id] = []
+RateLimit = namedtuple("RateLimit", ["threshold", "time_window"])
 
-        recent_messages = [
-            msg_time
-            for msg_time in self.user_messages[user_id]
-            if now - msg_time < datetime.timedelta(seconds=self.time_window)
-        ]
 
-        recent_messages.append(now)
-        self.user_messages[user_id] = recent_messages
+class RateLimiter:
+    """Sliding-window rate limiter with bounded memory.
 
-        if len(recent_messages) > self.threshold:
-            return True
-        else:
-            return False
+    Each (user, action) pair keeps a deque of at most ``threshold + 1``
+    timestamps, so a check costs O(1) amortized. Entries live in an LRU
+    ordered dict: pairs idle for longer than ``idle_ttl`` seconds are evicted
+    as new traffic arrives, and the least recently seen pairs are dropped once
+    more than ``max_entries`` are tracked.
+    """
+
+    def __init__(self, limits, max_entries=100_000, idle_ttl=3600):
+        self.limits = limits
+        self.max_entries = max_entries
+        self.idle_ttl = idle_ttl
+        self._entries = OrderedDict()
 
+    def is_limited(self, user_id, action="message", now=None):
+        """Records one ``action`` by ``user_id`` and tells if it exceeds the limit."""
+        limit = self.limits[action]
+        now = time.monotonic() if now is None else now
+        self._evict_idle(now)
 
-spam_filter = SpamFilter()
+        key = (user_id, action)
+        timestamps = self._entries.get(key)
+        if timestamps is None:
+            timestamps = deque(maxlen=limit.threshold + 1)
+            self._entries[key] = timestamps
+            if len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        else:
+            self._entries.move_to_end(key)
+
+        while timestamps and now - timestamps[0] >= limit.time_window:
+            timestamps.popleft()
+        timestamps.append(now)
+        return len(timestamps) > limit.threshold
+
+    def _evict_idle(self, now):
+        entries = self._entries
+        while entries:
+            key, timestamps = next(iter(entries.items()))
+            if now - timestamps[-1] < self.idle_ttl:
+                break
+            del entries[key]
+
+    def __len__(self):
+        return len(self._entries)
+
+
+rate_limiter = RateLimiter(
+    {action: RateLimit(*limit) for action, limit in config.RATE_LIMITS.items()},
+    max_entries=config.RATE_LIMIT_MAX_ENTRIES,
+    idle_ttl=config.RATE_LIMIT_IDLE_TTL,
+)
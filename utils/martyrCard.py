@@ -0,0 +1,148 @@
+import html
+import re
+import string
+from collections import OrderedDict
+
+CAPTION_LIMIT = 1024  # Telegram limit for photo captions
+MESSAGE_LIMIT = 4096  # Telegram limit for text messages
+
+CARD_TEMPLATES = {
+    "card": (
+        "<b>معلومات الشهيد:</b>\n\n"
+        "الاسم: {name}\n"
+        "اسم الأم: {mother_name}\n"
+        "تاريخ الميلاد: {birth_date}\n"
+        "تاريخ الوفاة: {death_date}\n"
+        "سبب الوفاة: {death_cause}\n"
+        "مكان الإقامة: {residence}\n"
+        "ملاحظات: {notes}\n"
+    ),
+    "review": (
+        "<b>معلومات الشهيد (للمراجعة):</b>\n\n"
+        "الاسم: {name}\n"
+        "اسم الأم: {mother_name}\n"
+        "تاريخ الميلاد: {birth_date}\n"
+        "تاريخ الوفاة: {death_date}\n"
+        "سبب الوفاة: {death_cause}\n"
+        "مكان الإقامة: {residence}\n"
+        "ملاحظات: {notes}\n"
+    ),
+}
+
+# Fields shortened, in this order, when a card is over the length limit.
+TRUNCATE_ORDER = ("notes", "death_cause", "residence", "mother_name", "name")
+
+EMPTY_VALUE = "لا يوجد"
+
+
+def _utf16_length(text):
+    """Length as Telegram counts it, in UTF-16 code units."""
+    return len(text.encode("utf-16-le")) // 2
+
+
+def _compile(template):
+    """Splits ``template`` into (literal, visible length, field) parts once."""
+    parts = []
+    for literal, field, _, _ in string.Formatter().parse(template):
+        visible = html.unescape(re.sub(r"<[^>]+>", "", literal))
+        parts.append((literal, _utf16_length(visible), field))
+    return tuple(parts)
+
+
+_COMPILED = {name: _compile(template) for name, template in CARD_TEMPLATES.items()}
+
+
+class CardCache:
+    """LRU cache of rendered cards keyed by (id, version, template, limit).
+
+    ``version`` is bumped by a trigger whenever a displayed field of the
+    row changes, so an edited record misses the cache instead of showing a
+    stale card and nothing needs to be invalidated by hand.
+    """
+
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._cards = OrderedDict()
+
+    def get(self, key):
+        card = self._cards.get(key)
+        if card is None:
+            self.misses += 1
+            return None
+        self._cards.move_to_end(key)
+        self.hits += 1
+        return card
+
+    def put(self, key, card):
+        self._cards[key] = card
+        self._cards.move_to_end(key)
+        if len(self._cards) > self.maxsize:
+            self._cards.popitem(last=False)
+
+    def clear(self):
+        self._cards.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "name": "martyr_cards",
+            "size": len(self._cards),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+card_cache = CardCache()
+
+
+def _render(parts, values, limit):
+    values = {
+        field: str(values.get(field) or "") or EMPTY_VALUE
+        for _, _, field in parts
+        if field
+    }
+    length = sum(
+        visible + (_utf16_length(values[field]) if field else 0)
+        for _, visible, field in parts
+    )
+    for field in TRUNCATE_ORDER:
+        if length <= limit:
+            break
+        value = values.get(field)
+        if not value or value == EMPTY_VALUE:
+            continue
+        original = _utf16_length(value)
+        budget = original - (length - limit) - 1  # room left before the "…"
+        keep = max(0, min(len(value), budget))
+        while keep and _utf16_length(value[:keep]) > budget:
+            keep -= 1
+        values[field] = value[:keep] + "…"
+        length += _utf16_length(values[field]) - original
+    return "".join(
+        literal + (html.escape(values[field], quote=False) if field else "")
+        for literal, _, field in parts
+    )
+
+
+def render_card(martyr, template="card", caption=False):
+    """Returns the HTML card of ``martyr`` with every value escaped.
+
+    With ``caption`` the card fits a photo caption (1024 characters),
+    otherwise a text message; long free-text fields are cut with an
+    ellipsis. Saved records, which carry ``id`` and ``version``, are served
+    from ``card_cache``; drafts are rendered every time.
+    """
+    limit = CAPTION_LIMIT if caption else MESSAGE_LIMIT
+    key = None
+    if martyr.get("id") is not None and martyr.get("version") is not None:
+        key = (martyr["id"], martyr["version"], template, limit)
+        card = card_cache.get(key)
+        if card is not None:
+            return card
+    card = _render(_COMPILED[template], martyr, limit)
+    if key is not None:
+        card_cache.put(key, card)
+    return card
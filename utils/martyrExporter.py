@@ -0,0 +1,134 @@
+"""Streaming export of approved martyr records to CSV, JSON Lines or ZIP.
+
+Run from the repository root:
+
+    python -m utils.martyrExporter martyrs.csv
+    python -m utils.martyrExporter martyrs.zip --format csv --photos
+"""
+import argparse
+import csv
+import json
+import os
+import tempfile
+import zipfile
+
+from utils.database import database_manager
+
+EXPORT_FORMATS = ("csv", "jsonl")
+
+EXPORT_FIELDS = (
+    "id",
+    "name",
+    "mother_name",
+    "birth_date",
+    "death_date",
+    "death_cause",
+    "residence",
+    "notes",
+    "photo",
+)
+
+
+class MartyrExport:
+    """Writes martyr rows to a CSV or JSON Lines file batch by batch.
+
+    Pass ``write_batch`` to DatabaseManager.export_martyrs. With
+    ``include_photos`` the output is a ZIP holding ``martyrs.<format>`` and
+    the photos under ``photos/``. Photos are added to the archive as their
+    batch arrives and the data file is spooled to disk, so memory use does
+    not grow with the number of rows.
+    """
+
+    def __init__(self, path, file_format="csv", include_photos=False):
+        if file_format not in EXPORT_FORMATS:
+            raise ValueError(f"Unsupported export format: {file_format}")
+        self.path = path
+        self.file_format = file_format
+        self.include_photos = include_photos
+        self.rows = 0
+        self.photos = 0
+        self._zip = None
+        if include_photos:
+            self._zip = zipfile.ZipFile(path, "w", allowZip64=True)
+            fd, self._data_path = tempfile.mkstemp(
+                dir=os.path.dirname(path) or None, suffix=f".{file_format}"
+            )
+            self._file = os.fdopen(fd, "w", newline="", encoding="utf-8")
+        else:
+            self._data_path = path
+            self._file = open(path, "w", newline="", encoding="utf-8")
+        if file_format == "csv":
+            # The BOM lets spreadsheet programs detect UTF-8 Arabic text.
+            self._file.write("\ufeff")
+            self._csv = csv.DictWriter(self._file, EXPORT_FIELDS, extrasaction="ignore")
+            self._csv.writeheader()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.close()
+
+    def _bundle_photo(self, row):
+        path = row.get("photo")
+        if not path or not os.path.exists(path):
+            return None
+        arcname = f"photos/{row['id']}{os.path.splitext(path)[1] or '.jpg'}"
+        # JPEGs do not compress further; store them as they are.
+        self._zip.write(path, arcname, compress_type=zipfile.ZIP_STORED)
+        self.photos += 1
+        return arcname
+
+    def write_batch(self, rows):
+        for row in rows:
+            if self._zip is not None:
+                row["photo"] = self._bundle_photo(row)
+            if self.file_format == "csv":
+                self._csv.writerow(row)
+            else:
+                record = {field: row.get(field) for field in EXPORT_FIELDS}
+                self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self.rows += len(rows)
+
+    def close(self):
+        if self._file.closed:
+            return
+        self._file.close()
+        if self._zip is not None:
+            try:
+                self._zip.write(
+                    self._data_path,
+                    f"martyrs.{self.file_format}",
+                    compress_type=zipfile.ZIP_DEFLATED,
+                )
+                self._zip.close()
+            finally:
+                os.remove(self._data_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=EXPORT_FORMATS)
+    parser.add_argument(
+        "--photos", action="store_true", help="write a ZIP that includes the photos"
+    )
+    args = parser.parse_args()
+
+    file_format = args.format or os.path.splitext(args.path)[1].lstrip(".").lower()
+    if file_format not in EXPORT_FORMATS:
+        parser.error("pass --format csv or --format jsonl")
+
+    database_manager.connect()
+    try:
+        with MartyrExport(args.path, file_format, args.photos) as export:
+            count = database_manager.export_martyrs(export.write_batch)
+    finally:
+        database_manager.close()
+    if count is None:
+        raise SystemExit("Export failed, see the log.")
+    print(f"Exported {count} martyrs and {export.photos} photos to {args.path}.")
+
+
+if __name__ == "__main__":
+    main()
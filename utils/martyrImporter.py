@@ -0,0 +1,295 @@
+"""Bulk import of martyr records from CSV, JSON or JSON Lines files.
+
+Rows are read lazily, validated and written in chunks, each chunk in one
+transaction, so files with tens of thousands of rows never sit in memory
+whole. Rows that cannot be decoded are reported like invalid ones; if the
+file itself cannot be read further, the rows read so far are still written
+and the report says where reading stopped. Names already stored (pending
+or approved) are skipped as duplicates, compared on their normalized form.
+
+Run from the repository root:
+
+    python -m utils.martyrImporter martyrs.csv
+"""
+import argparse
+import asyncio
+import csv
+import json
+import os
+import re
+import time
+
+from utils.database import database_manager
+from utils.dateValidator import DateValidator
+
+FORMATS = ("csv", "json", "jsonl")
+
+FIELDS = (
+    "name",
+    "mother_name",
+    "birth_date",
+    "death_date",
+    "death_cause",
+    "residence",
+    "notes",
+)
+
+# Column headers as they appear on the bot's own cards.
+FIELD_ALIASES = {
+    "الاسم": "name",
+    "اسم الأم": "mother_name",
+    "تاريخ الميلاد": "birth_date",
+    "تاريخ الوفاة": "death_date",
+    "سبب الوفاة": "death_cause",
+    "مكان الإقامة": "residence",
+    "ملاحظات": "notes",
+}
+
+
+def detect_format(path):
+    extension = os.path.splitext(path)[1].lower().lstrip(".")
+    return extension if extension in FORMATS else None
+
+
+class RowError(ValueError):
+    """Yielded by a reader in place of a row it could not decode."""
+
+
+def _read_csv(path):
+    with open(path, newline="", encoding="utf-8-sig") as file:
+        reader = csv.DictReader(file)
+        while True:
+            try:
+                row = next(reader)
+            except StopIteration:
+                return
+            except csv.Error as e:
+                yield RowError(f"invalid CSV: {e}")
+                continue
+            yield row
+
+
+def _read_jsonl(path):
+    with open(path, encoding="utf-8-sig") as file:
+        for line in file:
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError as e:
+                yield RowError(f"invalid JSON: {e.msg} at column {e.colno}")
+
+
+# A number, true, false or null running into the end of the buffer.
+_JSON_PARTIAL_TOKEN = re.compile(r"[-+0-9.eE]*|t(r(ue?)?)?|f(a(l(se?)?)?)?|n(u(ll?)?)?")
+# A \uXXXX escape, or a surrogate pair, running into the end of the buffer.
+_JSON_PARTIAL_ESCAPE = re.compile(r"u[0-9a-fA-F]{0,4}(\\(u[0-9a-fA-F]{0,4})?)?")
+
+
+def _is_truncated(error, buffer):
+    """True when ``error`` only means ``buffer`` ends in the middle of an item."""
+    if error.msg.startswith("Unterminated string"):
+        return True
+    rest = buffer[error.pos:].rstrip()
+    if error.msg.startswith("Invalid \\uXXXX escape"):
+        return _JSON_PARTIAL_ESCAPE.fullmatch(rest) is not None
+    return _JSON_PARTIAL_TOKEN.fullmatch(rest) is not None
+
+
+def _read_json_array(path, chunk_size=65536):
+    """Yields the objects of a top-level JSON array without loading the file."""
+    decoder = json.JSONDecoder()
+    with open(path, encoding="utf-8-sig") as file:
+        buffer = file.read(chunk_size).lstrip()
+        if not buffer.startswith("["):
+            raise ValueError("JSON file must contain an array of objects.")
+        buffer = buffer[1:]
+        while True:
+            buffer = buffer.lstrip().lstrip(",").lstrip()
+            if buffer.startswith("]"):
+                return
+            try:
+                item, end = decoder.raw_decode(buffer)
+            except json.JSONDecodeError as e:
+                # Read on only for an item cut off by the end of the buffer;
+                # a malformed one would pull the rest of the file in.
+                more = file.read(chunk_size) if _is_truncated(e, buffer) else ""
+                if not more:
+                    raise
+                buffer += more
+                continue
+            yield item
+            buffer = buffer[end:]
+            if len(buffer) < chunk_size:
+                buffer += file.read(chunk_size)
+
+
+READERS = {"csv": _read_csv, "json": _read_json_array, "jsonl": _read_jsonl}
+
+
+class ImportReport:
+    def __init__(self):
+        self.rows = 0
+        self.inserted = 0
+        self.duplicates = 0
+        self.errors = []  # (row number, message)
+        self.failure = None  # why reading stopped before the end of the file
+        self.started = time.perf_counter()
+        self.elapsed = 0.0
+
+    @property
+    def rows_per_second(self):
+        return self.rows / self.elapsed if self.elapsed else 0.0
+
+
+class MartyrImporter:
+    """Validates rows and feeds them to ``database_manager.import_martyrs``.
+
+    ``run`` drives a DatabaseManager directly and ``run_async`` an
+    AsyncDatabaseManager, reading and validating off the event loop.
+    """
+
+    def __init__(
+        self,
+        database_manager,
+        chunk_size=500,
+        status="approved",
+        submitted_by=None,
+        max_text_length=200,
+    ):
+        self.database_manager = database_manager
+        self.chunk_size = chunk_size
+        self.status = status
+        self.submitted_by = submitted_by
+        self.max_text_length = max_text_length
+
+    def validate(self, row):
+        """Returns (record, None) for a valid row or (None, error message)."""
+        if isinstance(row, RowError):
+            return None, str(row)
+        if not isinstance(row, dict):
+            return None, "row is not an object"
+        record = dict.fromkeys(FIELDS)
+        for key, value in row.items():
+            field = FIELD_ALIASES.get((key or "").strip(), (key or "").strip())
+            if field in record and value is not None:
+                record[field] = str(value).strip() or None
+
+        if not record["name"]:
+            return None, "name is missing"
+        for field, value in record.items():
+            if value and len(value) > self.max_text_length:
+                return None, f"{field} is longer than {self.max_text_length} characters"
+        for field in ("birth_date", "death_date"):
+            value = record[field]
+            if not value:
+                continue
+            record[field] = DateValidator.normalize_date(value)
+            if record[field] is None:
+                return None, f"{field} {value!r} is not a YYYY-MM-DD date"
+            if DateValidator.is_future_date(record[field]):
+                return None, f"{field} {value!r} is in the future"
+        if (
+            record["birth_date"]
+            and record["death_date"]
+            and record["birth_date"] > record["death_date"]
+        ):
+            return None, "birth_date is after death_date"
+        return record, None
+
+    def chunks(self, path, report, file_format=None):
+        """Yields lists of (row number, record) and records bad rows in ``report``."""
+        file_format = file_format or detect_format(path)
+        if file_format not in READERS:
+            raise ValueError(f"Unsupported import format: {file_format}")
+        chunk = []
+        rows = enumerate(READERS[file_format](path), start=1)
+        while True:
+            try:
+                number, row = next(rows)
+            except StopIteration:
+                break
+            except (ValueError, csv.Error) as e:
+                report.failure = str(e)
+                break
+            report.rows += 1
+            record, error = self.validate(row)
+            if error:
+                report.errors.append((number, error))
+                continue
+            chunk.append((number, record))
+            if len(chunk) >= self.chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    def _store(self, report, chunk, result):
+        if result is None:
+            report.errors.extend((number, "database error") for number, _ in chunk)
+            return
+        inserted, duplicates = result
+        report.inserted += inserted
+        report.duplicates += len(duplicates)
+
+    def run(self, path, file_format=None):
+        report = ImportReport()
+        for chunk in self.chunks(path, report, file_format):
+            result = self.database_manager.import_martyrs(
+                [record for _, record in chunk], self.status, self.submitted_by
+            )
+            self._store(report, chunk, result)
+        report.elapsed = time.perf_counter() - report.started
+        return report
+
+    async def run_async(self, path, file_format=None):
+        report = ImportReport()
+        chunks = self.chunks(path, report, file_format)
+        while True:
+            chunk = await asyncio.to_thread(next, chunks, None)
+            if chunk is None:
+                break
+            result = await self.database_manager.import_martyrs(
+                [record for _, record in chunk], self.status, self.submitted_by
+            )
+            self._store(report, chunk, result)
+        report.elapsed = time.perf_counter() - report.started
+        return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=FORMATS)
+    parser.add_argument("--chunk-size", type=int, default=500)
+    parser.add_argument(
+        "--pending",
+        action="store_true",
+        help="import as pending submissions instead of approved records",
+    )
+    args = parser.parse_args()
+
+    importer = MartyrImporter(
+        database_manager,
+        chunk_size=args.chunk_size,
+        status="pending" if args.pending else "approved",
+    )
+    database_manager.connect()
+    try:
+        report = importer.run(args.path, args.format)
+    finally:
+        database_manager.close()
+
+    for number, error in report.errors:
+        print(f"row {number}: {error}")
+    if report.failure:
+        print(f"stopped reading after row {report.rows}: {report.failure}")
+    print(
+        f"{report.rows} rows: {report.inserted} inserted, "
+        f"{report.duplicates} duplicates, {len(report.errors)} errors "
+        f"in {report.elapsed:.2f}s ({report.rows_per_second:,.0f} rows/s)"
+    )
+
+
+if __name__ == "__main__":
+    main()
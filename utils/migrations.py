@@ -0,0 +1,431 @@
+import datetime
+import logging
+import sqlite3
+
+from utils.arabicNormalizer import normalize_name
+
+logger = logging.getLogger(__name__)
+
+STATUSES = ("pending", "approved", "rejected", "archived")
+
+FTS_TRIGGERS = (
+    """
+    CREATE TRIGGER IF NOT EXISTS martyrs_fts_insert AFTER INSERT ON martyrs BEGIN
+        INSERT INTO martyrs_fts (rowid, name_normalized)
+        VALUES (new.id, new.name_normalized);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS martyrs_fts_delete AFTER DELETE ON martyrs BEGIN
+        INSERT INTO martyrs_fts (martyrs_fts, rowid, name_normalized)
+        VALUES ('delete', old.id, old.name_normalized);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS martyrs_fts_update
+    AFTER UPDATE OF name_normalized ON martyrs BEGIN
+        INSERT INTO martyrs_fts (martyrs_fts, rowid, name_normalized)
+        VALUES ('delete', old.id, old.name_normalized);
+        INSERT INTO martyrs_fts (rowid, name_normalized)
+        VALUES (new.id, new.name_normalized);
+    END
+    """,
+)
+
+PHOTO_REF_TRIGGERS = (
+    """
+    CREATE TRIGGER IF NOT EXISTS photos_ref_insert
+    AFTER INSERT ON martyrs WHEN new.photo IS NOT NULL BEGIN
+        INSERT INTO photos (path, ref_count, updated_at)
+        VALUES (new.photo, 1, strftime('%s', 'now'))
+        ON CONFLICT (path) DO UPDATE SET ref_count = ref_count + 1;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS photos_ref_delete
+    AFTER DELETE ON martyrs WHEN old.photo IS NOT NULL BEGIN
+        UPDATE photos SET ref_count = ref_count - 1, updated_at = strftime('%s', 'now')
+        WHERE path = old.photo;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS photos_ref_update
+    AFTER UPDATE OF photo ON martyrs WHEN old.photo IS NOT new.photo BEGIN
+        UPDATE photos SET ref_count = ref_count - 1, updated_at = strftime('%s', 'now')
+        WHERE path = old.photo;
+        INSERT INTO photos (path, ref_count, updated_at)
+        SELECT new.photo, 1, strftime('%s', 'now') WHERE new.photo IS NOT NULL
+        ON CONFLICT (path) DO UPDATE SET ref_count = ref_count + 1;
+    END
+    """,
+)
+
+MARTYRS_INDEXES = (
+    "CREATE INDEX IF NOT EXISTS idx_martyrs_name_normalized ON martyrs (name_normalized)",
+    "CREATE INDEX IF NOT EXISTS idx_martyrs_pending ON martyrs (id) WHERE status = 'pending'",
+    "CREATE INDEX IF NOT EXISTS idx_martyrs_rejected "
+    "ON martyrs (reviewed_at) WHERE status = 'rejected'",
+)
+
+
+def table_exists(cursor, name):
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE name = ?", (name,))
+    return cursor.fetchone() is not None
+
+
+def _ensure_column(cursor, table, column, definition):
+    """Adds ``column`` to ``table`` and returns True if it was missing."""
+    cursor.execute(f"PRAGMA table_info({table})")
+    if column in {row[1] for row in cursor.fetchall()}:
+        return False
+    cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+    return True
+
+
+def _status_check():
+    return f"CHECK (status IN ({', '.join(repr(status) for status in STATUSES)}))"
+
+
+def initial_schema(cursor):
+    """Schema as it was before versioning.
+
+    Every step checks what already exists, so databases created by any
+    earlier release are brought to the same state.
+    """
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS martyrs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            mother_name TEXT,
+            birth_date TEXT,
+            death_date TEXT,
+            death_cause TEXT,
+            residence TEXT,
+            photo TEXT,  -- Store the file path
+            notes TEXT,
+            approved INTEGER DEFAULT 0 --  0: pending, 1: approved
+        )
+    """
+    )
+    cursor.execute("CREATE TABLE IF NOT EXISTS admins (user_id INTEGER PRIMARY KEY)")
+    cursor.execute(
+        "CREATE TABLE IF NOT EXISTS blocked_users (user_id INTEGER PRIMARY KEY)"
+    )
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS persistence (
+            kind TEXT NOT NULL,  -- user_data, conversation:<name>, ...
+            key TEXT NOT NULL,
+            data BLOB NOT NULL,  -- pickled value
+            PRIMARY KEY (kind, key)
+        )
+    """
+    )
+    _ensure_column(cursor, "martyrs", "photo_file_id", "TEXT")
+    _ensure_column(cursor, "martyrs", "submitted_by", "INTEGER")
+
+    # Review status, which supersedes the approved flag.
+    if _ensure_column(
+        cursor, "martyrs", "status", f"TEXT NOT NULL DEFAULT 'pending' {_status_check()}"
+    ):
+        cursor.execute("UPDATE martyrs SET status = 'approved' WHERE approved = 1")
+    _ensure_column(cursor, "martyrs", "rejection_reason", "TEXT")
+    _ensure_column(cursor, "martyrs", "reviewed_at", "INTEGER")
+
+    # Normalized names for search.
+    _ensure_column(cursor, "martyrs", "name_normalized", "TEXT")
+    cursor.execute("SELECT id, name FROM martyrs WHERE name_normalized IS NULL")
+    cursor.executemany(
+        "UPDATE martyrs SET name_normalized = ? WHERE id = ?",
+        [(normalize_name(name), martyr_id) for martyr_id, name in cursor.fetchall()],
+    )
+    for index in MARTYRS_INDEXES:
+        cursor.execute(index)
+
+    # FTS5 trigram index; without FTS5 search falls back to prefix matching.
+    if not table_exists(cursor, "martyrs_fts"):
+        try:
+            cursor.execute(
+                """
+                CREATE VIRTUAL TABLE martyrs_fts USING fts5(
+                    name_normalized,
+                    content = 'martyrs',
+                    content_rowid = 'id',
+                    tokenize = 'trigram'
+                )
+            """
+            )
+            cursor.execute("INSERT INTO martyrs_fts (martyrs_fts) VALUES ('rebuild')")
+        except sqlite3.OperationalError as e:
+            logger.warning(f"FTS5 trigram index unavailable: {e}")
+    if table_exists(cursor, "martyrs_fts"):
+        for trigger in FTS_TRIGGERS:
+            cursor.execute(trigger)
+
+    # Reference counts of stored photo files.
+    if not table_exists(cursor, "photos"):
+        cursor.execute(
+            """
+            CREATE TABLE photos (
+                path TEXT PRIMARY KEY,
+                ref_count INTEGER NOT NULL DEFAULT 0,
+                updated_at INTEGER NOT NULL  -- unix time of the last reference change
+            )
+        """
+        )
+        cursor.execute(
+            """
+            INSERT INTO photos (path, ref_count, updated_at)
+            SELECT photo, COUNT(*), strftime('%s', 'now') FROM martyrs
+            WHERE photo IS NOT NULL GROUP BY photo
+        """
+        )
+    for trigger in PHOTO_REF_TRIGGERS:
+        cursor.execute(trigger)
+
+
+LEGACY_DATE_FORMATS = (
+    "%Y-%m-%d",
+    "%Y/%m/%d",
+    "%Y.%m.%d",
+    "%d-%m-%Y",
+    "%d/%m/%Y",
+    "%d.%m.%Y",
+)
+
+DATE_LABELS = {"birth_date": "تاريخ الميلاد", "death_date": "تاريخ الوفاة"}
+
+
+def _legacy_date(text):
+    """Returns ``text`` as YYYY-MM-DD, or None if no known format matches."""
+    for date_format in LEGACY_DATE_FORMATS:
+        try:
+            return datetime.datetime.strptime(text.strip(), date_format).date().isoformat()
+        except ValueError:
+            continue
+    return None
+
+
+def typed_dates(cursor):
+    """Rebuilds martyrs with ISO date CHECKs, created_at and more indexes.
+
+    Dates that cannot be read are set to NULL and their original text is
+    appended to the notes, so nothing entered is lost. created_at is left
+    NULL for rows that predate it.
+    """
+    cursor.execute(
+        """
+        SELECT id, birth_date, death_date, notes FROM martyrs
+        WHERE birth_date IS NOT NULL OR death_date IS NOT NULL
+    """
+    )
+    fixes = []
+    for martyr_id, birth_date, death_date, notes in cursor.fetchall():
+        dates = {"birth_date": birth_date, "death_date": death_date}
+        unreadable = []
+        for field, text in dates.items():
+            if text is None:
+                continue
+            dates[field] = _legacy_date(text) if text.strip() else None
+            if text.strip() and dates[field] is None:
+                unreadable.append(f"{DATE_LABELS[field]}: {text}")
+        if dates != {"birth_date": birth_date, "death_date": death_date}:
+            notes = "\n".join(filter(None, [notes, *unreadable])) or None
+            fixes.append((dates["birth_date"], dates["death_date"], notes, martyr_id))
+    cursor.executemany(
+        "UPDATE martyrs SET birth_date = ?, death_date = ?, notes = ? WHERE id = ?",
+        fixes,
+    )
+    if fixes:
+        logger.info(f"Converted the dates of {len(fixes)} martyrs to YYYY-MM-DD.")
+
+    cursor.execute(
+        f"""
+        CREATE TABLE martyrs_new (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            name_normalized TEXT,
+            mother_name TEXT,
+            birth_date TEXT CHECK (birth_date IS NULL OR date(birth_date) IS birth_date),
+            death_date TEXT CHECK (death_date IS NULL OR date(death_date) IS death_date),
+            death_cause TEXT,
+            residence TEXT,
+            photo TEXT,  -- path in the PhotoStore
+            photo_file_id TEXT,
+            notes TEXT,
+            submitted_by INTEGER,
+            status TEXT NOT NULL DEFAULT 'pending' {_status_check()},
+            approved INTEGER DEFAULT 0,  -- kept in step with status
+            rejection_reason TEXT,
+            reviewed_at INTEGER,  -- unix time
+            created_at INTEGER DEFAULT (CAST(strftime('%s', 'now') AS INTEGER))
+        )
+    """
+    )
+    columns = (
+        "id, name, name_normalized, mother_name, birth_date, death_date, "
+        "death_cause, residence, photo, photo_file_id, notes, submitted_by, "
+        "status, approved, rejection_reason, reviewed_at"
+    )
+    cursor.execute(
+        f"INSERT INTO martyrs_new ({columns}, created_at) "
+        f"SELECT {columns}, NULL FROM martyrs"
+    )
+    # Keep AUTOINCREMENT from reusing the ids of deleted rows.
+    cursor.execute("SELECT seq FROM sqlite_sequence WHERE name = 'martyrs'")
+    row = cursor.fetchone()
+    cursor.execute("DROP TABLE martyrs")
+    cursor.execute("ALTER TABLE martyrs_new RENAME TO martyrs")
+    if row is not None:
+        cursor.execute(
+            "UPDATE sqlite_sequence SET seq = max(seq, ?) WHERE name = 'martyrs'",
+            (row[0],),
+        )
+
+    for index in MARTYRS_INDEXES:
+        cursor.execute(index)
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_martyrs_status ON martyrs (status, id)"
+    )
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_martyrs_death_date ON martyrs (death_date)"
+    )
+    # Ids are copied unchanged, so the external-content FTS index stays valid.
+    if table_exists(cursor, "martyrs_fts"):
+        for trigger in FTS_TRIGGERS:
+            cursor.execute(trigger)
+    for trigger in PHOTO_REF_TRIGGERS:
+        cursor.execute(trigger)
+
+
+# Counters of approved martyrs per dimension, read by the statistics view.
+STATS_DIMENSIONS = {
+    "residence": "{row}.residence",
+    "death_cause": "{row}.death_cause",
+    "death_year": "substr({row}.death_date, 1, 4)",
+}
+
+
+def _stats_change(row, delta):
+    """Trigger body that adds ``delta`` to the counters of ``row`` (old/new)."""
+    values = ", ".join(
+        f"('{dimension}', COALESCE({expression.format(row=row)}, ''), {delta})"
+        for dimension, expression in STATS_DIMENSIONS.items()
+    )
+    statement = (
+        f"INSERT INTO martyr_stats (dimension, key, count) VALUES {values} "
+        "ON CONFLICT (dimension, key) DO UPDATE SET count = count + excluded.count;"
+    )
+    if delta < 0:
+        statement += " DELETE FROM martyr_stats WHERE count = 0;"
+    return statement
+
+
+STATS_TRIGGERS = (
+    f"""
+    CREATE TRIGGER IF NOT EXISTS martyr_stats_insert
+    AFTER INSERT ON martyrs WHEN new.status = 'approved' BEGIN
+        {_stats_change("new", 1)}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS martyr_stats_delete
+    AFTER DELETE ON martyrs WHEN old.status = 'approved' BEGIN
+        {_stats_change("old", -1)}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS martyr_stats_update_old
+    AFTER UPDATE OF status, residence, death_cause, death_date ON martyrs
+    WHEN old.status = 'approved' BEGIN
+        {_stats_change("old", -1)}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS martyr_stats_update_new
+    AFTER UPDATE OF status, residence, death_cause, death_date ON martyrs
+    WHEN new.status = 'approved' BEGIN
+        {_stats_change("new", 1)}
+    END
+    """,
+)
+
+
+def stats_query():
+    """SELECT computing the counters from scratch, one GROUP BY per dimension."""
+    return " UNION ALL ".join(
+        f"SELECT '{dimension}' AS dimension, "
+        f"COALESCE({expression.format(row='martyrs')}, '') AS key, COUNT(*) AS count "
+        "FROM martyrs WHERE status = 'approved' GROUP BY 2"
+        for dimension, expression in STATS_DIMENSIONS.items()
+    )
+
+
+def stats_aggregates(cursor):
+    """Adds martyr_stats, kept up to date by triggers on martyrs."""
+    cursor.execute(
+        """
+        CREATE TABLE martyr_stats (
+            dimension TEXT NOT NULL,  -- a key of STATS_DIMENSIONS
+            key TEXT NOT NULL,  -- '' when the field is empty
+            count INTEGER NOT NULL,
+            PRIMARY KEY (dimension, key)
+        ) WITHOUT ROWID
+    """
+    )
+    cursor.execute(
+        f"INSERT INTO martyr_stats (dimension, key, count) {stats_query()}"
+    )
+    for trigger in STATS_TRIGGERS:
+        cursor.execute(trigger)
+
+
+# Bumps martyrs.version when a field shown on the record card changes.
+# Recursive triggers are off, so the inner UPDATE does not fire it again.
+VERSION_TRIGGER = """
+    CREATE TRIGGER IF NOT EXISTS martyrs_version
+    AFTER UPDATE OF name, mother_name, birth_date, death_date, death_cause,
+        residence, notes ON martyrs BEGIN
+        UPDATE martyrs SET version = old.version + 1 WHERE id = new.id;
+    END
+"""
+
+
+def record_versions(cursor):
+    """Adds martyrs.version for caches keyed by record id and version."""
+    _ensure_column(cursor, "martyrs", "version", "INTEGER NOT NULL DEFAULT 0")
+    cursor.execute(VERSION_TRIGGER)
+
+
+# Append new migrations at the end; a database's user_version is the number
+# of migrations applied to it.
+MIGRATIONS = (initial_schema, typed_dates, stats_aggregates, record_versions)
+
+
+def migrate(connection):
+    """Applies the migrations newer than the database's ``user_version``.
+
+    Each migration runs in its own transaction together with the version
+    bump, so a failing migration leaves the database at the previous
+    version. An up-to-date database costs one PRAGMA read.
+    """
+    version = connection.execute("PRAGMA user_version").fetchone()[0]
+    if version > len(MIGRATIONS):
+        raise RuntimeError(
+            f"Database schema version {version} is newer than this code "
+            f"supports ({len(MIGRATIONS)})."
+        )
+    for number, migration in enumerate(MIGRATIONS[version:], start=version + 1):
+        cursor = connection.cursor()
+        try:
+            cursor.execute("BEGIN IMMEDIATE")
+            migration(cursor)
+            cursor.execute(f"PRAGMA user_version = {number}")
+            connection.commit()
+        except BaseException:
+            connection.rollback()
+            raise
+        finally:
+            cursor.close()
+        logger.info(f"Migrated the database to schema version {number}: {migration.__name__}.")
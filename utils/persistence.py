@@ -0,0 +1,121 @@
+import asyncio
+import json
+import logging
+import pickle
+
+from telegram.ext import BasePersistence, PersistenceInput
+
+logger = logging.getLogger(__name__)
+
+
+class SQLitePersistence(BasePersistence):
+    """Keeps conversation states and user_data in the bot's SQLite database.
+
+    The Application hands over changed data every ``update_interval`` seconds.
+    Those calls only stage the changes in memory; they are written together
+    in one transaction right after the Application's update run, and on
+    ``flush()`` at shutdown. Values are pickled, as conversation states are
+    ``States`` members.
+    """
+
+    def __init__(self, database_manager, update_interval=60):
+        super().__init__(
+            store_data=PersistenceInput(
+                bot_data=False, chat_data=False, user_data=True, callback_data=False
+            ),
+            update_interval=update_interval,
+        )
+        self.database_manager = database_manager
+        self._pending = {}
+        self._flush_task = None
+
+    async def _load(self, kind):
+        await self.database_manager.connect()
+        rows = await self.database_manager.load_persistence(kind)
+        loaded = []
+        for key, data in rows:
+            try:
+                loaded.append((key, pickle.loads(data)))
+            except (pickle.UnpicklingError, AttributeError, ValueError) as e:
+                # e.g. a conversation state that no longer exists.
+                logger.warning(f"Dropped unreadable persisted {kind} {key}: {e}")
+        return loaded
+
+    def _stage(self, kind, key, value):
+        self._pending[(kind, key)] = value
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush_pending())
+
+    async def _flush_pending(self):
+        # Yield once so every update_* call of the current run is staged first.
+        await asyncio.sleep(0)
+        self._flush_task = None
+        pending, self._pending = self._pending, {}
+        if not pending:
+            return
+        upserts = [
+            (kind, key, pickle.dumps(value))
+            for (kind, key), value in pending.items()
+            if value is not None
+        ]
+        deletes = [
+            (kind, key) for (kind, key), value in pending.items() if value is None
+        ]
+        if not await self.database_manager.write_persistence(upserts, deletes):
+            # Keep the batch for the next run unless newer data replaced it.
+            self._pending = {**pending, **self._pending}
+
+    async def get_user_data(self):
+        return {int(key): data for key, data in await self._load("user_data")}
+
+    async def get_chat_data(self):
+        return {}
+
+    async def get_bot_data(self):
+        return {}
+
+    async def get_callback_data(self):
+        return None
+
+    async def get_conversations(self, name):
+        return {
+            tuple(json.loads(key)): state
+            for key, state in await self._load(f"conversation:{name}")
+        }
+
+    async def update_conversation(self, name, key, new_state):
+        self._stage(f"conversation:{name}", json.dumps(list(key)), new_state)
+
+    async def update_user_data(self, user_id, data):
+        self._stage("user_data", str(user_id), data)
+
+    async def drop_user_data(self, user_id):
+        self._stage("user_data", str(user_id), None)
+
+    async def update_chat_data(self, chat_id, data):
+        pass
+
+    async def drop_chat_data(self, chat_id):
+        pass
+
+    async def update_bot_data(self, data):
+        pass
+
+    async def update_callback_data(self, data):
+        pass
+
+    async def refresh_user_data(self, user_id, user_data):
+        pass
+
+    async def refresh_chat_data(self, chat_id, chat_data):
+        pass
+
+    async def refresh_bot_data(self, bot_data):
+        pass
+
+    async def flush(self):
+        if self._flush_task is not None:
+            await self._flush_task
+        if self._pending:
+            self._flush_task = asyncio.create_task(self._flush_pending())
+            await self._flush_task
@@ -0,0 +1,95 @@
+import asyncio
+import logging
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+from utils.config import config
+from utils.photoStore import photo_store
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:
+    Image = None
+
+logger = logging.getLogger(__name__)
+
+
+def _render_variants(source_path, variants, quality):
+    """Writes each missing ``{path: max_side}`` variant of ``source_path``.
+
+    Runs in a worker process. Variants are re-encoded as baseline JPEG
+    without EXIF metadata, after applying the EXIF orientation. A variant is
+    skipped when the source already fits it; the original is served then.
+    """
+    with Image.open(source_path) as image:
+        image = ImageOps.exif_transpose(image).convert("RGB")
+        for path, max_side in variants.items():
+            if os.path.exists(path) or max(image.size) <= max_side:
+                continue
+            variant = image.copy()
+            variant.thumbnail((max_side, max_side), Image.Resampling.LANCZOS)
+            # Two workers may render the same photo; each writes its own file.
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as tmp_file:
+                    variant.save(tmp_file, "JPEG", quality=quality, optimize=True)
+                os.replace(tmp_path, path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+
+
+class PhotoProcessor:
+    """Generates the display variant of stored photos.
+
+    Image decoding and resizing are CPU bound, so they run in a process pool
+    rather than on the event loop. Without Pillow installed the processor is
+    disabled and originals are served as-is.
+    """
+
+    def __init__(self, store, max_size=1280, workers=2, quality=85):
+        self.store = store
+        self.max_size = max_size
+        self.workers = workers
+        self.quality = quality
+        self._executor = None
+
+    def start(self):
+        if Image is None:
+            logger.warning("Pillow is not installed; photo variants are disabled.")
+            return
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    async def process(self, path):
+        """Creates the variants of ``path`` that are smaller than it.
+
+        Returns True when processing succeeded.
+        """
+        if self._executor is None:
+            return False
+        variants = {
+            self.store.variant_path(path, "display"): self.max_size,
+        }
+        loop = asyncio.get_running_loop()
+        try:
+            await loop.run_in_executor(
+                self._executor, _render_variants, path, variants, self.quality
+            )
+            return True
+        except Exception as e:
+            logger.error(f"Failed to process photo {path}: {e}")
+            return False
+
+
+photo_processor = PhotoProcessor(
+    photo_store,
+    max_size=config.PHOTO_MAX_SIZE,
+    workers=config.PHOTO_WORKERS,
+)
@@ -0,0 +1,78 @@
+import asyncio
+import logging
+import os
+
+from telegram.error import BadRequest, TelegramError
+
+from utils.config import config
+from utils.photoStore import photo_store
+
+logger = logging.getLogger(__name__)
+
+
+def display_photo_size(photo_sizes, max_side=config.PHOTO_MAX_SIZE):
+    """Returns the largest PhotoSize no bigger than ``max_side``.
+
+    Telegram lists the sizes of a photo smallest first; reusing the
+    file_id of the largest one would resend the full resolution original.
+    Falls back to the smallest size when every one is bigger.
+    """
+    fitting = [size for size in photo_sizes if max(size.width, size.height) <= max_side]
+    return fitting[-1] if fitting else photo_sizes[0]
+
+
+async def send_martyr_photo(bot, database_manager, chat_id, martyr, **kwargs):
+    """Sends the photo of ``martyr`` and returns the sent message.
+
+    The Telegram ``photo_file_id`` is reused when known so the bytes are not
+    uploaded again; the local file in ``martyr["photo"]`` (its display variant
+    when one was generated) is only a fallback. After an upload the new
+    file_id is kept on ``martyr`` and, for saved records, in the database.
+    """
+    file_id = martyr.get("photo_file_id")
+    if file_id:
+        try:
+            return await bot.send_photo(chat_id, file_id, **kwargs)
+        except BadRequest as e:
+            if not martyr.get("photo"):
+                raise
+            logger.warning(f"Cached photo file_id rejected, uploading file: {e}")
+
+    with open(photo_store.upload_path(martyr["photo"]), "rb") as photo_file:
+        message = await bot.send_photo(chat_id, photo_file, **kwargs)
+
+    martyr["photo_file_id"] = display_photo_size(message.photo).file_id
+    if martyr.get("id"):
+        await database_manager.set_photo_file_id(martyr["id"], martyr["photo_file_id"])
+    return message
+
+
+async def backfill_photo_file_ids(bot, database_manager, chat_id, delay=1.0):
+    """Uploads stored photos that have no file_id yet to ``chat_id``.
+
+    Meant for a private storage chat: each upload is deleted right away and
+    only its file_id is kept. ``delay`` spaces uploads to stay under
+    Telegram's flood limits.
+    """
+    after_id = 0
+    backfilled = 0
+    while True:
+        rows = await database_manager.get_photos_without_file_id(after_id)
+        if not rows:
+            break
+        for row in rows:
+            after_id = row["id"]
+            if not os.path.exists(row["photo"]):
+                continue
+            try:
+                with open(photo_store.upload_path(row["photo"]), "rb") as photo_file:
+                    message = await bot.send_photo(chat_id, photo_file)
+                await database_manager.set_photo_file_id(
+                    row["id"], display_photo_size(message.photo).file_id
+                )
+                await message.delete()
+                backfilled += 1
+            except (TelegramError, ValueError) as e:
+                logger.error(f"Failed to backfill photo of martyr {row['id']}: {e}")
+            await asyncio.sleep(delay)
+    logger.info(f"Backfilled {backfilled} photo file_ids.")
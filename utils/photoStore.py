@@ -0,0 +1,87 @@
+import hashlib
+import logging
+import os
+import tempfile
+
+from utils.config import config
+
+logger = logging.getLogger(__name__)
+
+
+class PhotoStore:
+    """Content-addressed storage for martyr photos.
+
+    A photo is stored once under the BLAKE2b hash of its bytes, sharded as
+    ``<root>/ab/cd/<hash>.jpg`` so no directory grows past a few hundred
+    entries. Which files are still in use is tracked in the ``photos`` table
+    (see DatabaseManager.register_photo). Resized variants (see
+    PhotoProcessor) live next to the original as ``<hash>.<variant>.jpg``.
+
+    Paths come back from user data and the database, so every method that
+    touches a file refuses one that does not resolve under ``root``.
+    """
+
+    VARIANTS = ("display",)
+
+    def __init__(self, root):
+        self.root = root
+
+    def _check(self, path):
+        root = os.path.realpath(self.root)
+        if os.path.commonpath([root, os.path.realpath(path)]) != root:
+            raise ValueError(f"Photo path outside the photo store: {path!r}")
+
+    @staticmethod
+    def digest(data):
+        return hashlib.blake2b(data, digest_size=32).hexdigest()
+
+    def path_for(self, digest):
+        return os.path.join(self.root, digest[:2], digest[2:4], f"{digest}.jpg")
+
+    @staticmethod
+    def variant_path(path, variant):
+        root, extension = os.path.splitext(path)
+        return f"{root}.{variant}{extension}"
+
+    def upload_path(self, path):
+        """Returns the display variant of ``path`` if it exists, else ``path``."""
+        self._check(path)
+        display_path = self.variant_path(path, "display")
+        return display_path if os.path.exists(display_path) else path
+
+    def save(self, data, path=None):
+        """Writes ``data`` atomically unless an identical file already exists."""
+        path = path or self.path_for(self.digest(data))
+        self._check(path)
+        if os.path.exists(path):
+            return path
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as tmp_file:
+                tmp_file.write(data)
+                tmp_file.flush()
+                os.fsync(tmp_file.fileno())
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        return path
+
+    def delete(self, path):
+        try:
+            self._check(path)
+        except ValueError as e:
+            logger.error(f"Refusing to delete photo: {e}")
+            return
+        for file_path in [path] + [self.variant_path(path, v) for v in self.VARIANTS]:
+            try:
+                os.remove(file_path)
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logger.error(f"Failed to delete photo {file_path}: {e}")
+
+
+photo_store = PhotoStore(config.UPLOAD_PATH)
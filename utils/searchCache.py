@@ -0,0 +1,92 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class SearchCache:
+    """TTL + LRU cache of search results, keyed by normalized query.
+
+    Entries expire after ``ttl`` seconds and the least recently used one is
+    dropped beyond ``maxsize``. DatabaseManager invalidates write-through:
+    updates drop the entries that contain a changed id, inserts and
+    approvals clear everything since a new row may match any query.
+
+    Searches run on several reader threads while writes invalidate from
+    the writer, so a lookup started before an invalidation could store a
+    stale result after it. ``generation`` guards against that: take it
+    before querying and pass it to ``put``, which ignores the result if an
+    invalidation happened in between.
+    """
+
+    def __init__(self, maxsize=1024, ttl=300, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.clock = clock
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> (expires, results)
+        self._keys_by_id = {}
+
+    def get(self, key):
+        """Returns copies of the cached rows, or None on a miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= self.clock():
+                self._drop(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            # Callers may annotate rows (e.g. a new photo_file_id).
+            return [dict(row) for row in entry[1]]
+
+    def put(self, key, results, generation):
+        with self._lock:
+            if generation != self.generation or self.maxsize <= 0:
+                return
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (self.clock() + self.ttl, [dict(row) for row in results])
+            for row in results:
+                self._keys_by_id.setdefault(row["id"], set()).add(key)
+            while len(self._entries) > self.maxsize:
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+
+    def _drop(self, key):
+        _, results = self._entries.pop(key)
+        for row in results:
+            keys = self._keys_by_id.get(row["id"])
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._keys_by_id[row["id"]]
+
+    def invalidate_ids(self, martyr_ids):
+        with self._lock:
+            self.generation += 1
+            for martyr_id in martyr_ids:
+                for key in list(self._keys_by_id.get(martyr_id, ())):
+                    self._drop(key)
+
+    def clear(self):
+        with self._lock:
+            self.generation += 1
+            self._entries.clear()
+            self._keys_by_id.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "name": "search_results",
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
@@ -0,0 +1,193 @@
+import asyncio
+import datetime
+import logging
+import random
+import time
+
+from telegram.error import BadRequest, Forbidden, NetworkError, RetryAfter, TimedOut
+from telegram.ext import BaseRateLimiter
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def is_full(self):
+        self._refill()
+        return self.tokens >= self.capacity
+
+    async def acquire(self):
+        while True:
+            self._refill()
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class _ChatQueue:
+    def __init__(self, bucket):
+        self.lock = asyncio.Lock()
+        self.bucket = bucket
+        self.waiting = 0
+
+
+class OutboundRateLimiter(BaseRateLimiter):
+    """Schedules outgoing messages within Telegram's flood limits.
+
+    Every send/edit/copy/forward request waits for a token from a global
+    bucket and from its chat's bucket (stricter for groups) and is sent in
+    FIFO order per chat. RetryAfter is honoured and network errors are
+    retried with jittered exponential backoff, except timeouts: a request
+    that timed out may have been delivered, so it is not sent again. A plain sendMessage identical
+    to one still queued for the same chat shares that request's result
+    instead of being sent twice. Other API calls pass straight through.
+    """
+
+    LIMITED_PREFIXES = ("send", "edit", "copy", "forward")
+
+    def __init__(
+        self,
+        overall_limit=(30, 1),
+        private_chat_limit=(1, 1),
+        group_chat_limit=(20, 60),
+        chat_burst=3,
+        max_retries=3,
+        base_backoff=0.5,
+        max_backoff=30,
+        max_idle_chats=10_000,
+    ):
+        """Limits are ``(count, seconds)`` pairs, as in config.RATE_LIMITS."""
+        count, seconds = overall_limit
+        self.overall = TokenBucket(count / seconds, count)
+        self.private_chat_limit = private_chat_limit
+        self.group_chat_limit = group_chat_limit
+        self.chat_burst = chat_burst
+        self.max_retries = max_retries
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.max_idle_chats = max_idle_chats
+        self._chats = {}
+        self._in_flight = {}
+        self.sent = 0
+        self.retried = 0
+        self.coalesced = 0
+        self.failed = 0
+
+    async def initialize(self):
+        pass
+
+    async def shutdown(self):
+        pass
+
+    @property
+    def queue_depth(self):
+        return sum(chat.waiting for chat in self._chats.values())
+
+    def stats(self):
+        depths = {chat_id: chat.waiting for chat_id, chat in self._chats.items()}
+        return {
+            "queue_depth": sum(depths.values()),
+            "busiest_chats": sorted(depths.items(), key=lambda item: -item[1])[:5],
+            "sent": self.sent,
+            "retried": self.retried,
+            "coalesced": self.coalesced,
+            "failed": self.failed,
+        }
+
+    def _chat_queue(self, chat_id):
+        chat = self._chats.get(chat_id)
+        if chat is None:
+            if len(self._chats) >= self.max_idle_chats:
+                self._drop_idle_chats()
+            is_group = isinstance(chat_id, str) or (chat_id or 0) < 0
+            count, seconds = self.group_chat_limit if is_group else self.private_chat_limit
+            bucket = TokenBucket(count / seconds, max(count, self.chat_burst))
+            chat = self._chats[chat_id] = _ChatQueue(bucket)
+        return chat
+
+    def _drop_idle_chats(self):
+        for chat_id, chat in list(self._chats.items()):
+            if not chat.waiting and chat.bucket.is_full():
+                del self._chats[chat_id]
+
+    @staticmethod
+    def _coalesce_key(endpoint, data):
+        if endpoint != "sendMessage" or set(data) - {"chat_id", "text", "parse_mode"}:
+            return None
+        return (data.get("chat_id"), data.get("text"), data.get("parse_mode"))
+
+    def _backoff(self, attempt):
+        delay = min(self.max_backoff, self.base_backoff * 2**attempt)
+        return delay * random.uniform(0.5, 1)
+
+    async def process_request(
+        self, callback, args, kwargs, endpoint, data, rate_limit_args
+    ):
+        if not endpoint.startswith(self.LIMITED_PREFIXES):
+            return await callback(*args, **kwargs)
+
+        key = self._coalesce_key(endpoint, data)
+        if key is not None and key in self._in_flight:
+            self.coalesced += 1
+            return await asyncio.shield(self._in_flight[key])
+
+        future = asyncio.get_running_loop().create_future()
+        if key is not None:
+            self._in_flight[key] = future
+        try:
+            result = await self._send(callback, args, kwargs, data.get("chat_id"))
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            if not future.cancelled():
+                # Mark the exception as retrieved when nobody shared the request.
+                future.exception()
+            raise
+        finally:
+            if key is not None:
+                del self._in_flight[key]
+
+    async def _send(self, callback, args, kwargs, chat_id):
+        chat = self._chat_queue(chat_id)
+        chat.waiting += 1
+        try:
+            async with chat.lock:
+                attempt = 0
+                while True:
+                    await self.overall.acquire()
+                    await chat.bucket.acquire()
+                    try:
+                        result = await callback(*args, **kwargs)
+                        self.sent += 1
+                        return result
+                    except RetryAfter as e:
+                        delay = e.retry_after
+                        if isinstance(delay, datetime.timedelta):
+                            delay = delay.total_seconds()
+                    except (BadRequest, Forbidden, TimedOut):
+                        self.failed += 1
+                        raise
+                    except NetworkError as e:
+                        delay = self._backoff(attempt)
+                        logger.warning(f"Send to chat {chat_id} failed ({e}), retrying.")
+
+                    if attempt >= self.max_retries:
+                        self.failed += 1
+                        raise
+                    attempt += 1
+                    self.retried += 1
+                    await asyncio.sleep(delay)
+        finally:
+            chat.waiting -= 1
@@ -2,20 +2,21 @@ from enum import Enum
 
 
 class States(Enum):
-    (
-        STATE_MOTHER_NAME,
-        STATE_BIRTH_DATE,
-        STATE_DEATH_DATE,
-        STATE_DEATH_CAUSE,
-        STATE_RESIDENCE,
-        STATE_PHOTO,
-        STATE_NOTES,
-        STATE_CONFIRM,
-        STATE_EDIT,
-        STATE_DISPLAY,
-        PROCESS_ADMIN_ACTION,
-        PROCESS_SEARCH_MARTYR,
-        CHECK_MARTYR_EXISTS,
-        EDIT_FIELD,
-        HANDLE_PENDING_MARTYR_SELECTION,
-    ) = range(15)
+    # Values are persisted with conversation state; never renumber or reuse one.
+    STATE_MOTHER_NAME = 0
+    STATE_BIRTH_DATE = 1
+    STATE_DEATH_DATE = 2
+    STATE_DEATH_CAUSE = 3
+    STATE_RESIDENCE = 4
+    STATE_PHOTO = 5
+    STATE_NOTES = 6
+    STATE_CONFIRM = 7
+    STATE_EDIT = 8
+    STATE_DISPLAY = 9
+    PROCESS_ADMIN_ACTION = 10
+    PROCESS_SEARCH_MARTYR = 11
+    CHECK_MARTYR_EXISTS = 12
+    EDIT_FIELD = 13
+    # 14 was HANDLE_PENDING_MARTYR_SELECTION.
+    IMPORT_DOCUMENT = 15
+    EDIT_PHOTO = 16
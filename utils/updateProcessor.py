@@ -0,0 +1,67 @@
+import asyncio
+import logging
+
+from telegram.ext import BaseUpdateProcessor
+
+logger = logging.getLogger(__name__)
+
+
+class PerUserUpdateProcessor(BaseUpdateProcessor):
+    """Processes updates of different users concurrently, each user's in order.
+
+    Updates of one user wait on that user's lock, in arrival order, so their
+    ConversationHandler state is never raced. Only updates holding their
+    user's lock take one of the ``max_concurrent_updates`` execution slots.
+    The base class semaphore admits ``max_concurrent_updates *
+    backlog_factor`` queued and running updates; a user with
+    ``max_user_backlog`` updates already waiting has further ones dropped,
+    so one user's burst cannot fill that bound for everyone else.
+    """
+
+    def __init__(self, max_concurrent_updates, backlog_factor=4, max_user_backlog=8):
+        super().__init__(max_concurrent_updates * backlog_factor)
+        self.max_running_updates = max_concurrent_updates
+        self.max_user_backlog = max_user_backlog
+        self.dropped = 0
+        self._running = asyncio.BoundedSemaphore(max_concurrent_updates)
+        self._locks = {}  # user/chat id -> [lock, number of updates using it]
+
+    @staticmethod
+    def _key(update):
+        user = getattr(update, "effective_user", None)
+        if user is not None:
+            return user.id
+        chat = getattr(update, "effective_chat", None)
+        return chat.id if chat is not None else None
+
+    async def do_process_update(self, update, coroutine):
+        key = self._key(update)
+        if key is None:
+            async with self._running:
+                await coroutine
+            return
+
+        entry = self._locks.get(key)
+        if entry is None:
+            entry = self._locks[key] = [asyncio.Lock(), 0]
+        if entry[1] > self.max_user_backlog:
+            # Close the coroutine so it is not reported as never awaited.
+            coroutine.close()
+            self.dropped += 1
+            logger.warning(f"Dropped an update of {key}: too many updates queued.")
+            return
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                async with self._running:
+                    await coroutine
+        finally:
+            entry[1] -= 1
+            if entry[1] == 0:
+                del self._locks[key]
+
+    async def initialize(self):
+        pass
+
+    async def shutdown(self):
+        pass
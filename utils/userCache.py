@@ -0,0 +1,45 @@
+class UserSetCache:
+    """In-memory copy of a table of user ids (admins, blocked_users).
+
+    The set is loaded once and then kept in sync write-through by the
+    DatabaseManager methods that modify the table, so membership checks are
+    O(1) lookups. Until it is loaded, lookups report a miss and the caller
+    falls back to SQL.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.loaded = False
+        self.hits = 0
+        self.misses = 0
+        self._user_ids = set()
+
+    def load(self, user_ids):
+        self._user_ids = set(user_ids)
+        self.loaded = True
+
+    def clear(self):
+        self._user_ids = set()
+        self.loaded = False
+
+    def lookup(self, user_id):
+        """Returns True/False from memory, or None on a cache miss."""
+        if not self.loaded:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return user_id in self._user_ids
+
+    def add(self, user_id):
+        self._user_ids.add(user_id)
+
+    def discard(self, user_id):
+        self._user_ids.discard(user_id)
+
+    def stats(self):
+        return {
+            "name": self.name,
+            "size": len(self._user_ids),
+            "hits": self.hits,
+            "misses": self.misses,
+        }